@@ -0,0 +1,145 @@
+import os
+import json
+import math
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from ffmpeg_runner import run_ffmpeg
+
+# Looping background-music bed, encoded once.
+#
+# Instead of `-stream_loop -1 -i voice.mp3 -c:a aac` over the whole video, the
+# track is padded to a whole number of AAC frames (at most ~21 ms of silence per
+# loop), encoded three times back to back, and split into:
+#   head.aac - encoder priming frame + the first loop
+#   loop.aac - the middle loop (its frames already overlap cleanly with the
+#              loop before and after it, so they can be repeated as-is)
+# Any length is then head + loop + loop + ... cut at a frame boundary. ADTS
+# frames are self-contained, so repetition is plain byte copying and the audio
+# cost no longer depends on video length. The final cut to the exact video
+# length happens in the mux (-shortest).
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "video_to_slideshow", "audio_beds")
+SAMPLE_RATE = 48000
+CHANNELS = 2
+BITRATE = "192k"
+FRAME_SAMPLES = 1024  # samples per AAC frame; also the encoder priming delay
+
+def source_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_adts_frames(path):
+    """Split an ADTS .aac file into its frames."""
+    with open(path, "rb") as f:
+        data = f.read()
+    frames, pos = [], 0
+    while pos + 7 <= len(data):
+        if data[pos] != 0xFF or (data[pos + 1] & 0xF0) != 0xF0:
+            raise Exception(f"❌ Lost ADTS sync in {path} at byte {pos}")
+        length = ((data[pos + 3] & 0x03) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+        frames.append(data[pos:pos + length])
+        pos += length
+    return frames
+
+def probe_samples(path):
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path
+    ], capture_output=True, text=True, check=True)
+    return round(float(result.stdout.strip()) * SAMPLE_RATE)
+
+def encode_loop(source, folder, gain_db=0.0):
+    """Encode one loop period (cached) -> head.aac, loop.aac, meta.json in folder."""
+    loop_frames = math.ceil(probe_samples(source) / FRAME_SAMPLES)
+    period = loop_frames * FRAME_SAMPLES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        unit = os.path.join(tmp, "unit.wav")
+        encoded = os.path.join(tmp, "three_loops.aac")
+
+        # Exactly `period` samples of PCM: resample, pad with silence, trim
+        run_ffmpeg([
+            "ffmpeg", "-y", "-i", source,
+            "-af", f"volume={gain_db}dB,aresample={SAMPLE_RATE},apad=whole_len={period},atrim=end_sample={period}",
+            "-ar", str(SAMPLE_RATE), "-ac", str(CHANNELS),
+            unit
+        ], step="audio bed pcm", capture_stderr=True)
+
+        run_ffmpeg([
+            "ffmpeg", "-y", "-stream_loop", "2", "-i", unit,
+            "-c:a", "aac", "-b:a", BITRATE,
+            encoded
+        ], step="audio bed encode", capture_stderr=True)
+
+        frames = read_adts_frames(encoded)
+
+    # Frame k decodes to input samples [(k-1)*1024, k*1024) because of the priming delay
+    if len(frames) < 2 * loop_frames + 1:
+        raise Exception(f"❌ Audio bed encode too short: {len(frames)} frames for loop of {loop_frames}")
+    with open(os.path.join(folder, "head.aac"), "wb") as f:
+        f.write(b"".join(frames[:loop_frames + 1]))
+    with open(os.path.join(folder, "loop.aac"), "wb") as f:
+        f.write(b"".join(frames[loop_frames + 1:2 * loop_frames + 1]))
+    with open(os.path.join(folder, "meta.json"), "w") as f:
+        json.dump({"loop_frames": loop_frames, "sample_rate": SAMPLE_RATE,
+                   "channels": CHANNELS, "bitrate": BITRATE}, f)
+
+def cached_loop(source, gain_db=0.0):
+    """Folder with the encoded loop for this source + encode params, built if missing."""
+    params = f"{SAMPLE_RATE}|{CHANNELS}|{BITRATE}|{FRAME_SAMPLES}"
+    if gain_db:
+        params += f"|{gain_db}dB"
+    key = hashlib.sha256(f"{source_hash(source)}|{params}".encode()).hexdigest()[:32]
+    folder = os.path.join(CACHE_DIR, key)
+    if os.path.exists(os.path.join(folder, "meta.json")):
+        return folder
+
+    print(f"🎵 Encoding one loop of {source} (cached for next time)...")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_folder = tempfile.mkdtemp(prefix="bed-", dir=CACHE_DIR)
+    try:
+        encode_loop(source, tmp_folder, gain_db)
+        os.replace(tmp_folder, folder)
+    except OSError:
+        # Kisi doosre process ne same bed pehle bana diya
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        if not os.path.exists(os.path.join(folder, "meta.json")):
+            raise
+    except Exception:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise
+    return folder
+
+def build(source, duration, output_file, gain_db=0.0):
+    """Write an ADTS bed of at least `duration` seconds to output_file.
+
+    gain_db is baked into the cached encode (see loudness.gain_db), so level
+    matching costs nothing once the bed exists.
+    """
+    folder = cached_loop(source, gain_db)
+    with open(os.path.join(folder, "meta.json"), "r") as f:
+        loop_frames = json.load(f)["loop_frames"]
+    head = read_adts_frames(os.path.join(folder, "head.aac"))
+    loop = read_adts_frames(os.path.join(folder, "loop.aac"))
+
+    # priming frame + enough frames for the duration + one for the decoder overlap
+    needed = 1 + math.ceil(duration * SAMPLE_RATE / FRAME_SAMPLES) + 1
+    with open(output_file, "wb") as f:
+        written = min(needed, len(head))
+        f.write(b"".join(head[:written]))
+        while written < needed:
+            take = min(loop_frames, needed - written)
+            f.write(b"".join(loop[:take]))
+            written += take
+    return output_file
+
+def input_args(bed_file):
+    """ffmpeg input options for a bed; shifts out the encoder priming frame."""
+    return ["-itsoffset", f"-{FRAME_SAMPLES / SAMPLE_RATE:.6f}", "-i", bed_file]
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import socket
+import platform
+import tempfile
+import threading
+import subprocess
+from ffmpeg_runner import run_ffmpeg
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are kept apart
+    fcntl = None
+
+# Encoder autotune: chhote samples encode karke is machine par har preset / CRF /
+# threads ki speed aur size naapta hai, phir wo setting chunta hai jo poori
+# render ko diye gaye time budget mein khatam kar de.
+#
+# Measurements are cached per machine + content type, so only the first run
+# pays for calibration; the budget itself can change freely between runs.
+
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "video_to_slideshow", "autotune.json")
+PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow"]
+CRFS = [20, 23]
+THREADS = sorted({0, 2, max(1, (os.cpu_count() or 2) // 2)})  # 0 = let x264 decide
+SAMPLE_POSITIONS = [0.1, 0.5, 0.9]  # where in the timeline to take samples
+SAMPLE_SECONDS = 4
+SAFETY_MARGIN = 0.9           # only use 90% of the budget for the projection
+
+def machine_key():
+    try:
+        version = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout.split("\n")[0]
+    except OSError:
+        version = "unknown"
+    return f"{socket.gethostname()}|{platform.machine()}|{os.cpu_count()}|{version}"
+
+def load_cache():
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+_thread_lock = threading.Lock()
+
+class _Lock:
+    """Cache lock across threads and processes (batch / pipeline workers calibrate at once)."""
+    def __enter__(self):
+        _thread_lock.acquire()
+        self.file = None
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+            self.file = open(CACHE_FILE + ".lock", "w")
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.file:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+        _thread_lock.release()
+
+def save_cache(cache):
+    """Atomic write through a temp file of this process's own (call it under _Lock)."""
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(CACHE_FILE), prefix="autotune.", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, CACHE_FILE)
+
+def save_result(key, candidate, result):
+    """Add one measurement, merged into the cache as it is now on disk."""
+    with _Lock():
+        cache = load_cache()
+        cache.setdefault(key, {})[candidate] = result
+        save_cache(cache)
+
+def encoder_args(settings):
+    """libx264 flags for a settings dict from tune()."""
+    args = ["-preset", settings["preset"], "-crf", str(settings["crf"])]
+    if settings.get("threads"):
+        args += ["-threads", str(settings["threads"])]
+    return args
+
+def candidate_key(settings):
+    return f"{settings['preset']}/{settings['crf']}/{settings.get('threads', 0)}"
+
+def measure(input_args, filter_args, duration, settings):
+    """Encode the samples with one setting. Returns speed (x realtime) and bytes per second."""
+    media, wall, size = 0.0, 0.0, 0
+    for position in SAMPLE_POSITIONS:
+        start = max(0.0, min(duration * position, duration - SAMPLE_SECONDS))
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "sample.mp4")
+            started = time.perf_counter()
+            run_ffmpeg([
+                "ffmpeg", "-y", "-ss", f"{start:.3f}", *input_args,
+                "-t", str(SAMPLE_SECONDS), *filter_args,
+                "-an", "-c:v", "libx264", *encoder_args(settings), "-pix_fmt", "yuv420p",
+                # always explicit, or governor.apply_threads would replace the measured value
+                *([] if settings.get("threads") else ["-threads", "0"]),
+                out
+            ], step=f"autotune {candidate_key(settings)}", capture_stderr=True)
+            wall += time.perf_counter() - started
+            size += os.path.getsize(out)
+            media += SAMPLE_SECONDS
+    return {"speed": media / wall, "bytes_per_s": size / media}
+
+def calibrate(input_args, filter_args, duration, content_type, refresh=False):
+    """Measure every candidate once for this machine + content type (cached)."""
+    key = f"{machine_key()}|{content_type}"
+    results = load_cache().get(key, {}) if not refresh else {}
+
+    candidates = [{"preset": p, "crf": c, "threads": t} for p in PRESETS for c in CRFS for t in THREADS]
+    missing = [c for c in candidates if candidate_key(c) not in results]
+    if missing:
+        print(f"⏱️ Calibrating {len(missing)} encoder settings for '{content_type}'...")
+    for settings in missing:
+        results[candidate_key(settings)] = dict(settings, **measure(input_args, filter_args, duration, settings))
+        # save as we go so an interrupted calibration is not lost
+        save_result(key, candidate_key(settings), results[candidate_key(settings)])
+    return [results[candidate_key(c)] for c in candidates]
+
+def choose(results, duration, budget):
+    """Best quality (lowest CRF), then smallest file, among settings that fit the budget."""
+    fitting = [r for r in results if duration / r["speed"] <= budget * SAFETY_MARGIN]
+    if not fitting:
+        fastest = max(results, key=lambda r: r["speed"])
+        print(f"⚠️ No setting fits {budget:.0f}s; using fastest ({candidate_key(fastest)}, "
+              f"~{duration / fastest['speed']:.0f}s).")
+        return fastest
+    return min(fitting, key=lambda r: (r["crf"], r["bytes_per_s"], -r["speed"]))
+
+def tune(input_args, filter_args, duration, budget, content_type, sample_duration=None):
+    """Pick preset / CRF / threads for a `duration`-second render within `budget` seconds.
+
+    sample_duration: length of the input when it is only a sample of the render.
+    """
+    results = calibrate(input_args, filter_args, sample_duration or duration, content_type)
+    best = choose(results, duration, budget)
+    print(f"🎛️ Autotune: preset={best['preset']} crf={best['crf']} threads={best['threads'] or 'auto'} "
+          f"(~{duration / best['speed']:.0f}s for {duration:.0f}s of video, budget {budget:.0f}s)")
+    return {"preset": best["preset"], "crf": best["crf"], "threads": best["threads"]}
+
+def main():
+    cache = load_cache()
+    if not cache:
+        print("No calibration data yet.")
+        return
+    for key, results in sorted(cache.items()):
+        print(f"\n🖥️ {key}")
+        for r in sorted(results.values(), key=lambda r: -r["speed"]):
+            print(f"   {candidate_key(r):<18} {r['speed']:7.2f}x  {r['bytes_per_s'] * 8 / 1000:8.0f} kbit/s")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print("Usage: python autotune.py   (shows cached calibration data)")
+    else:
+        main()
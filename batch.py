@@ -0,0 +1,170 @@
+import os
+import sys
+import copy
+import json
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pipeline
+
+# Batch mode: ek spool folder mein har input video ke liye ek job spec (.json).
+# Har job apne output folder aur apne scratch folder mein chalta hai, isliye
+# images.txt / temp_video.mp4 jaise fixed names aapas mein clash nahi karte.
+#
+# Job spec example (jobs/episode12.json):
+#   {
+#     "input": "/videos/episode12.mp4",
+#     "set": {"slideshow.TOTAL_DURATION": 2200, "cut.cut_end": null},
+#     "only": ["final"]
+#   }
+
+SPOOL_DIR = "jobs"
+OUTPUT_ROOT = "outputs"
+ASSETS_DIR = "."                     # voice.mp3, music.mp3, all/, complete.mp4
+SCRATCH_ROOT = os.environ.get("VTS_SCRATCH", tempfile.gettempdir())  # fast local disk
+WORKERS = max(1, (os.cpu_count() or 1) // 4)
+SHARED_ASSETS = ["voice.mp3", "music.mp3", "all", "complete.mp4"]
+
+def load_jobs(spool_dir):
+    jobs = []
+    for name in sorted(os.listdir(spool_dir)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(spool_dir, name)
+        with open(path, "r") as f:
+            job = json.load(f)
+        if "input" not in job:
+            raise Exception(f"❌ Job spec has no 'input': {path}")
+        job.setdefault("name", os.path.splitext(name)[0])
+        job["spec_path"] = path
+        jobs.append(job)
+    return jobs
+
+def signature(path):
+    """(name, size, mtime) of a file or of every file under a folder."""
+    if not os.path.isdir(path):
+        st = os.stat(path)
+        return [("", st.st_size, st.st_mtime_ns)]
+    found = []
+    for folder, _, files in os.walk(path):
+        for name in files:
+            st = os.stat(os.path.join(folder, name))
+            found.append((os.path.relpath(os.path.join(folder, name), path), st.st_size, st.st_mtime_ns))
+    return sorted(found)
+
+def link(src, dst):
+    """Symlink an asset into the job folder (copy if symlinks are not allowed).
+
+    A link to another file (job spec now names a different input) is
+    re-pointed, a copy that no longer matches its source is copied again.
+    """
+    if os.path.islink(dst):
+        if os.readlink(dst) == os.path.abspath(src):
+            return
+        os.remove(dst)
+    elif os.path.exists(dst):
+        if signature(dst) == signature(src):
+            return
+        shutil.rmtree(dst) if os.path.isdir(dst) else os.remove(dst)
+    try:
+        os.symlink(os.path.abspath(src), dst)
+    except OSError:
+        # copy2 / copytree keep mtimes, so signature() matches on the next run
+        if os.path.isdir(src):
+            shutil.copytree(src, dst)
+        else:
+            shutil.copy2(src, dst)
+
+def prepare_job_root(job, output_root, assets_dir):
+    root = os.path.abspath(os.path.join(output_root, job["name"]))
+    os.makedirs(root, exist_ok=True)
+    link(job["input"], os.path.join(root, "input.mp4"))
+    for asset in SHARED_ASSETS:
+        src = os.path.join(assets_dir, asset)
+        if os.path.exists(src):
+            link(src, os.path.join(root, asset))
+    return root
+
+def run_job(job, output_root, assets_dir, scratch_root, stage_jobs):
+    """Worker side: one video through the whole pipeline."""
+    stages = copy.deepcopy(pipeline.STAGES)
+    by_name = {s["name"]: s for s in stages}
+    for key, value in job.get("set", {}).items():
+        name, _, param = key.partition(".")
+        if name not in by_name or not param:
+            raise Exception(f"❌ Bad setting in job {job['name']}: {key}")
+        by_name[name]["params"][param] = value
+
+    root = prepare_job_root(job, output_root, assets_dir)
+    scratch = tempfile.mkdtemp(prefix=f"{job['name']}-", dir=scratch_root)
+    try:
+        results = pipeline.run_pipeline(stages, root=root, jobs=stage_jobs,
+                                        only=job.get("only"), scratch=scratch)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+def move_spec(job, spool_dir, status):
+    folder = os.path.join(spool_dir, status)
+    os.makedirs(folder, exist_ok=True)
+    os.replace(job["spec_path"], os.path.join(folder, os.path.basename(job["spec_path"])))
+
+def run_batch(spool_dir=SPOOL_DIR, output_root=OUTPUT_ROOT, assets_dir=ASSETS_DIR,
+              scratch_root=SCRATCH_ROOT, workers=WORKERS, stage_jobs=1):
+    jobs = load_jobs(spool_dir)
+    if not jobs:
+        print(f"⚠️ No job specs found in {spool_dir}")
+        return {}
+
+    os.makedirs(scratch_root, exist_ok=True)
+    # Sab jobs ka scratch ek batch folder ke andar, taaki crash par bhi ek rmtree kaafi ho
+    batch_scratch = tempfile.mkdtemp(prefix="vts-batch-", dir=scratch_root)
+    print(f"📦 {len(jobs)} jobs, {workers} workers, scratch: {batch_scratch}\n")
+
+    summary = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(run_job, job, output_root, assets_dir, batch_scratch, stage_jobs): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    results = future.result()
+                    status = "failed" if "failed" in results.values() else "done"
+                except Exception as e:
+                    print(f"❌ {job['name']}: {e}")
+                    status = "failed"
+                summary[job["name"]] = status
+                move_spec(job, spool_dir, status)
+                print(f"{'✅' if status == 'done' else '❌'} Job {job['name']}: {status}")
+    finally:
+        shutil.rmtree(batch_scratch, ignore_errors=True)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one pipeline job per spec in a spool folder.")
+    parser.add_argument("spool", nargs="?", default=SPOOL_DIR, help="folder with *.json job specs")
+    parser.add_argument("--out", default=OUTPUT_ROOT, help="one output folder per job is created here")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="folder with shared music / overlay assets")
+    parser.add_argument("--scratch", default=SCRATCH_ROOT, help="fast volume for temp files")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="jobs to run at the same time")
+    parser.add_argument("--stage-jobs", type=int, default=1, help="parallel stages inside each job")
+    args = parser.parse_args()
+
+    try:
+        summary = run_batch(args.spool, args.out, args.assets, args.scratch, args.workers, args.stage_jobs)
+    except Exception as e:
+        print(f"⚠️ Error: {e}")
+        sys.exit(1)
+
+    failed = [name for name, status in summary.items() if status != "done"]
+    print(f"\n🎉 {len(summary) - len(failed)} jobs done, {len(failed)} failed.")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+
+# Render-path benchmark. Synthetic images, overlay and music are generated
+# locally, then every render script is run on the same short / long timeline
+# and measured: encode fps, realtime factor, output bytes, peak RSS of ffmpeg,
+# CPU time and peak scratch disk use.
+#
+#   python benchmark.py                      # run everything, save JSON
+#   python benchmark.py --paths last fastlast --timelines short
+#   python benchmark.py --compare old.json new.json
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = "bench"
+RESULTS_DIR = "bench_results"
+TIMELINES = {"short": 60, "long": 600}
+NUM_IMAGES = 20
+DISK_POLL_SECONDS = 0.5
+
+def ffmpeg(*args):
+    subprocess.run(["ffmpeg", "-y", "-v", "error", *args], check=True)
+
+def make_assets(folder):
+    """Synthetic inputs: photos-like images, green-screen overlay, music, source clips."""
+    images = os.path.join(folder, "images")
+    if os.path.exists(os.path.join(folder, "done")):
+        return
+    print("🧪 Generating synthetic assets...")
+    os.makedirs(images, exist_ok=True)
+    for i in range(NUM_IMAGES):
+        # Har image alag pattern, taaki encoder ko asli photos jaisa kaam mile
+        source = ["mandelbrot", "testsrc2", "cellauto", "life"][i % 4]
+        ffmpeg("-f", "lavfi", "-i", f"{source}=size=1920x1080:rate=1",
+               "-ss", str(i // 4), "-frames:v", "1", "-q:v", "2",
+               os.path.join(images, f"scene_{i:04d}.jpg"))
+
+    ffmpeg("-f", "lavfi", "-i", "sine=frequency=220:sample_rate=48000:duration=47",
+           "-f", "lavfi", "-i", "sine=frequency=330:sample_rate=48000:duration=47",
+           "-filter_complex", "amix=inputs=2", "-c:a", "libmp3lame", "-b:a", "192k",
+           os.path.join(folder, "voice.mp3"))
+    ffmpeg("-f", "lavfi", "-i", "color=c=0x41CE43:size=1280x720:rate=25:duration=20",
+           "-f", "lavfi", "-i", "testsrc2=size=320x180:rate=25:duration=20",
+           "-filter_complex", "[0][1]overlay=x='mod(t*60,960)':y=270",
+           "-c:v", "libx264", "-pix_fmt", "yuv420p", os.path.join(folder, "complete.mp4"))
+    open(os.path.join(folder, "done"), "w").close()
+
+def make_sources(folder, seconds):
+    """Two source videos with audio for final.py, half the timeline each."""
+    clips = []
+    for name, source in (("src_a", "testsrc2"), ("src_b", "smptehdbars")):
+        path = os.path.join(folder, f"{name}_{seconds}.mp4")
+        if not os.path.exists(path):
+            ffmpeg("-f", "lavfi", "-i", f"{source}=size=1280x720:rate=25:duration={seconds / 2}",
+                   "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={seconds / 2}",
+                   "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+                   "-c:a", "aac", path)
+        clips.append(path)
+    return clips
+
+def path_overrides(name, assets, out, seconds):
+    """Script constants for one render path at a given timeline length.
+
+    Paths are lambdas so only the requested one is built (final's sources are
+    rendered on demand).
+    """
+    images = os.path.join(assets, "images")
+    music = os.path.join(assets, "voice.mp3")
+    per_image = seconds / NUM_IMAGES
+    paths = {
+        "last": lambda: ("last.py", {"IMAGE_FOLDER": images, "BACKGROUND_MUSIC": music,
+                                     "TOTAL_DURATION": seconds, "OUTPUT_VIDEO": out}),
+        # the old zoompan filter, to compare against last.py's default kenburns clips
+        "last-zoompan": lambda: ("last.py", {"IMAGE_FOLDER": images, "BACKGROUND_MUSIC": music,
+                                             "TOTAL_DURATION": seconds, "OUTPUT_VIDEO": out,
+                                             "ZOOM_ENGINE": "zoompan"}),
+        "fastlast": lambda: ("fastlast.py", {"IMAGE_FOLDER": images, "BACKGROUND_MUSIC": music,
+                                             "TOTAL_DURATION": seconds, "OUTPUT_VIDEO": out}),
+        "loading": lambda: ("loading.py", {"IMAGES_DIR": images, "TOTAL_DURATION": seconds,
+                                           "NUM_IMAGES": seconds // 14, "OUTPUT_VIDEO": out}),
+        "permotion": lambda: ("permotion.py", {"IMAGES_DIR": images, "NUM_IMAGES": NUM_IMAGES,
+                                               "DURATION_PER_IMAGE": per_image, "OUTPUT_VIDEO": out}),
+        "overlay": lambda: ("overlay.py", {"IMAGES_DIR": images, "NUM_IMAGES": NUM_IMAGES,
+                                           "DURATION_PER_IMAGE": per_image,
+                                           "OVERLAY_VIDEO": os.path.join(assets, "complete.mp4"),
+                                           "OUTPUT_VIDEO": out.replace(".mp4", "_slides.mp4"),
+                                           "FINAL_VIDEO": out}),
+        "final": lambda: ("final.py", {"VIDEOS_TO_MERGE": make_sources(assets, seconds), "FINAL_VIDEO": out}),
+    }
+    return paths[name]()
+
+def folder_size(folder):
+    total = 0
+    for dirpath, _, filenames in os.walk(folder):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass  # temp file removed while walking
+    return total
+
+def count_frames(path):
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+        "-show_entries", "stream=nb_read_packets,r_frame_rate:format=duration",
+        "-of", "json", path
+    ], capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    return int(info["streams"][0]["nb_read_packets"]), float(info["format"]["duration"])
+
+def run_path(name, seconds, assets, work):
+    scratch = os.path.join(work, f"{name}_{seconds}")
+    if os.path.exists(scratch):
+        shutil.rmtree(scratch)
+    os.makedirs(scratch)
+    out = os.path.join(work, f"{name}_{seconds}.mp4")
+    metrics = os.path.join(work, f"{name}_{seconds}.metrics.jsonl")
+    for path in (out, metrics):
+        if os.path.exists(path):
+            os.remove(path)
+
+    script, overrides = path_overrides(name, assets, out, seconds)
+    spec = {"script": os.path.join(SCRIPT_DIR, script), "overrides": overrides}
+
+    # Scratch disk use: poll the working folder while the script runs
+    peak_disk, stop = [0], threading.Event()
+    def poll():
+        while not stop.is_set():
+            peak_disk[0] = max(peak_disk[0], folder_size(scratch))
+            stop.wait(DISK_POLL_SECONDS)
+    poller = threading.Thread(target=poll, daemon=True)
+    poller.start()
+
+    print(f"⏱️ {name} @ {seconds}s...")
+    started = time.perf_counter()
+    with open(os.path.join(work, f"{name}_{seconds}.log"), "w") as log:
+        subprocess.run(
+            [sys.executable, os.path.join(SCRIPT_DIR, "pipeline.py"), "--run-script", json.dumps(spec)],
+            cwd=scratch, stdout=log, stderr=subprocess.STDOUT,
+            env=dict(os.environ, FFMPEG_METRICS=metrics, FFMPEG_STAGE=f"bench-{name}")
+        )
+    wall = time.perf_counter() - started
+    stop.set()
+    poller.join()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    if not os.path.exists(out):
+        return {"path": name, "timeline_s": seconds, "ok": False}
+
+    records = []
+    if os.path.exists(metrics):
+        with open(metrics, "r") as f:
+            records = [json.loads(line) for line in f if '"type": "ffmpeg"' in line]
+    frames, duration = count_frames(out)
+    return {
+        "path": name,
+        "timeline_s": seconds,
+        "ok": True,
+        "wall_s": round(wall, 3),
+        "encode_fps": round(frames / wall, 2),
+        "realtime_factor": round(duration / wall, 2),
+        "output_bytes": os.path.getsize(out),
+        "output_duration_s": round(duration, 3),
+        "ffmpeg_calls": len(records),
+        "cpu_s": round(sum(r.get("cpu_s", 0) for r in records), 3),
+        "peak_rss_bytes": max([r.get("peak_rss_bytes", 0) for r in records] or [0]),
+        "peak_scratch_bytes": peak_disk[0],
+    }
+
+def run_benchmark(paths, timelines, bench_dir=BENCH_DIR):
+    bench_dir = os.path.abspath(bench_dir)
+    assets = os.path.join(bench_dir, "assets")
+    work = os.path.join(bench_dir, "work")
+    os.makedirs(work, exist_ok=True)
+    make_assets(assets)
+
+    results = []
+    for timeline in timelines:
+        for name in paths:
+            result = run_path(name, TIMELINES[timeline], assets, work)
+            result["timeline"] = timeline
+            results.append(result)
+            if result["ok"]:
+                print(f"   ✅ {result['encode_fps']} fps, {result['realtime_factor']}x realtime, "
+                      f"{result['output_bytes'] / 1e6:.1f} MB")
+            else:
+                print(f"   ❌ failed (see {work}/{name}_{TIMELINES[timeline]}.log)")
+    return results
+
+def compare(old_file, new_file):
+    with open(old_file, "r") as f:
+        old = {(r["path"], r["timeline"]): r for r in json.load(f)["results"]}
+    with open(new_file, "r") as f:
+        new = {(r["path"], r["timeline"]): r for r in json.load(f)["results"]}
+
+    keys = ["encode_fps", "realtime_factor", "output_bytes", "peak_rss_bytes", "peak_scratch_bytes"]
+    print(f"{'path':<18}" + "".join(f"{k:>20}" for k in keys))
+    for key in sorted(set(old) & set(new)):
+        a, b = old[key], new[key]
+        if not (a["ok"] and b["ok"]):
+            print(f"{key[0] + '/' + key[1]:<18}   (failed in one run)")
+            continue
+        cells = []
+        for k in keys:
+            change = (b[k] - a[k]) / a[k] * 100 if a[k] else 0.0
+            cells.append(f"{change:+19.1f}%")
+        print(f"{key[0] + '/' + key[1]:<18}" + "".join(cells))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the render scripts on synthetic input.")
+    parser.add_argument("--paths", nargs="+", default=["last", "last-zoompan", "fastlast", "loading", "permotion", "overlay", "final"])
+    parser.add_argument("--timelines", nargs="+", default=list(TIMELINES), choices=list(TIMELINES))
+    parser.add_argument("--out", help="results JSON (default: bench_results/<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run_benchmark(args.paths, args.timelines)
+    out = args.out or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"created": datetime.now().isoformat(timespec="seconds"),
+                   "host": os.uname().nodename, "cpus": os.cpu_count(), "results": results}, f, indent=2)
+    print(f"\n📊 Results saved: {out}")
+
+if __name__ == "__main__":
+    main()
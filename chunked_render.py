@@ -0,0 +1,116 @@
+import os
+import json
+import shutil
+from ffmpeg_runner import run_ffmpeg
+
+# Resumable slideshow render. The timeline (list of image, duration) is cut
+# into chunks of about CHUNK_SECONDS on image boundaries; every chunk is its
+# own valid MP4 and is recorded in manifest.json once finished. After a crash
+# or kill, running the script again re-uses the same image list, skips the
+# finished chunks and only encodes the rest. A stream-copy concat joins them.
+
+CHUNK_SECONDS = 300
+MANIFEST = "manifest.json"
+
+def chunk_dir(output_file):
+    return os.path.splitext(output_file)[0] + "_chunks"
+
+def load_manifest(folder):
+    path = os.path.join(folder, MANIFEST)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return None
+
+def save_manifest(folder, manifest):
+    path = os.path.join(folder, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)  # atomic, so a kill never leaves half a manifest
+
+def split_chunks(entries, chunk_seconds):
+    chunks, current, length = [], [], 0
+    for path, duration in entries:
+        current.append([path, duration])
+        length += duration
+        if length >= chunk_seconds:
+            chunks.append(current)
+            current, length = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+def write_list(list_file, chunk):
+    with open(list_file, "w") as f:
+        for path, duration in chunk:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+            f.write(f"duration {duration}\n")
+        f.write(f"file '{os.path.abspath(chunk[-1][0])}'\n")  # last image repeated (concat quirk)
+
+def render(make_entries, output_file, encode_args, folder=None, chunk_seconds=CHUNK_SECONDS,
+           entry_seconds=None):
+    """Render a slideshow in resumable chunks.
+
+    make_entries() returns [(image_path, seconds), ...]; it is only called for a
+    fresh render - on resume the list stored in the manifest is used so random
+    picks stay the same. encode_args are the ffmpeg options between input and
+    output (filters, codec, preset...).
+
+    Each chunk is cut after its own entries (the repeated last image of the
+    concat list is dropped). entry_seconds(seconds) is the output length of one
+    entry when the filters change it - e.g. zoompan, which turns every image
+    into a fixed number of frames; by default an entry lasts its seconds.
+    """
+    entry_seconds = entry_seconds or (lambda seconds: seconds)
+    folder = folder or chunk_dir(output_file)
+    manifest = load_manifest(folder)
+    if manifest and manifest["encode_args"] == encode_args and manifest["chunk_seconds"] == chunk_seconds:
+        print(f"♻️ Resuming render: {len(manifest['done'])} chunks already done")
+    else:
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        os.makedirs(folder)
+        manifest = {"entries": make_entries(), "encode_args": encode_args,
+                    "chunk_seconds": chunk_seconds, "done": []}
+        save_manifest(folder, manifest)
+
+    chunks = split_chunks(manifest["entries"], chunk_seconds)
+    chunk_files = []
+    for i, chunk in enumerate(chunks):
+        chunk_file = os.path.join(folder, f"chunk_{i:04d}.mp4")
+        chunk_files.append(chunk_file)
+        if i in manifest["done"] and os.path.exists(chunk_file):
+            continue
+
+        seconds = sum(entry_seconds(duration) for _, duration in chunk)
+        print(f"🧱 Chunk {i + 1}/{len(chunks)} ({seconds}s)...")
+        list_file = os.path.join(folder, f"chunk_{i:04d}.txt")
+        partial = os.path.join(folder, f"chunk_{i:04d}.partial.mp4")
+        write_list(list_file, chunk)
+        run_ffmpeg([
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0", "-i", list_file,
+            *encode_args,
+            "-t", str(seconds),
+            partial
+        ], step=f"chunk {i:04d}", check=True)
+        os.replace(partial, chunk_file)
+        os.remove(list_file)
+
+        manifest["done"].append(i)
+        save_manifest(folder, manifest)
+
+    print("🔗 Joining chunks (stream copy)...")
+    join_list = os.path.join(folder, "join.txt")
+    with open(join_list, "w") as f:
+        for chunk_file in chunk_files:
+            f.write(f"file '{os.path.abspath(chunk_file)}'\n")
+    run_ffmpeg([
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0", "-i", join_list,
+        "-c", "copy",
+        output_file
+    ], step="join chunks", check=True)
+
+    shutil.rmtree(folder)
+    return output_file
@@ -1,21 +1,204 @@
+import os
 import subprocess
+from ffmpeg_runner import run_ffmpeg
 
 input_file = "final_output.mp4"  # apni original video ka naam yahan likhein
 output_file = "output_cut.mp4"  # final video ka naam
 
+# Cut window. cut_start = None means keep from the beginning,
+# cut_end = None means keep till the end.
 # 2 hours 21 minutes = 02:21:00
-cut_duration = "02:10:36"
+cut_start = None
+cut_end = "02:10:36"
 
-# ffmpeg command to trim the video
-command = [
-    "ffmpeg",
-    "-i", input_file,
-    "-t", cut_duration,  # -t means duration
-    "-c", "copy",        # copy without re-encoding
-    output_file
-]
+# Smart cut: copy everything between keyframes, re-encode only the partial
+# GOPs at the edges so the cut is frame-exact. False = old keyframe-only cut.
+SMART_CUT = True
+KEYFRAME_SEARCH_WINDOW = 30  # seconds around a cut point to scan for keyframes
+EDGE_CRF = 18                # quality for the re-encoded edge pieces
 
-# Run the command
-subprocess.run(command)
+# libx264 names for ffprobe's H.264 profile strings
+X264_PROFILES = {"Baseline": "baseline", "Constrained Baseline": "baseline",
+                 "Main": "main", "High": "high", "High 10": "high10",
+                 "High 4:2:2": "high422", "High 4:4:4 Predictive": "high444"}
 
-print("Done! Last 32 minutes cut ho chuki hain.")
+def parse_time(value):
+    """'HH:MM:SS(.ms)' ya seconds -> float seconds."""
+    if value is None:
+        return None
+    seconds = 0.0
+    for part in str(value).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def get_duration(filename):
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        filename
+    ], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def probe_stream(filename, selector, entries):
+    """Return a dict of ffprobe stream entries for the first matching stream."""
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-select_streams", selector,
+        "-show_entries", f"stream={entries}",
+        "-of", "default=noprint_wrappers=1",
+        filename
+    ], capture_output=True, text=True, check=True)
+    info = {}
+    for line in result.stdout.splitlines():
+        if "=" in line:
+            key, value = line.split("=", 1)
+            info[key] = value
+    return info
+
+def find_keyframes(filename, around):
+    """Keyframe times near `around`, read from packet flags (no decoding)."""
+    start = max(0.0, around - KEYFRAME_SEARCH_WINDOW)
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-read_intervals", f"{start}%{around + KEYFRAME_SEARCH_WINDOW}",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        filename
+    ], capture_output=True, text=True, check=True)
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) >= 2 and "K" in parts[1] and parts[0] not in ("", "N/A"):
+            keyframes.append(float(parts[0]))
+    return sorted(keyframes)
+
+def encoder_args(filename):
+    """Encoder settings that match the source, so the pieces concat cleanly."""
+    video = probe_stream(filename, "v:0", "codec_name,profile,pix_fmt,width,height,r_frame_rate,time_base")
+    audio = probe_stream(filename, "a:0", "codec_name,sample_rate,channels,bit_rate")
+
+    if video.get("codec_name") not in ("h264", None):
+        raise Exception(f"❌ Smart cut only supports H.264 video, found {video.get('codec_name')}.")
+
+    args = [
+        "-c:v", "libx264", "-preset", "medium", "-crf", str(EDGE_CRF),
+        "-pix_fmt", video.get("pix_fmt", "yuv420p"),
+        "-r", video.get("r_frame_rate", "30"),
+    ]
+    if video.get("profile") in X264_PROFILES:
+        args += ["-profile:v", X264_PROFILES[video["profile"]]]
+    if "/" in video.get("time_base", ""):
+        args += ["-video_track_timescale", video["time_base"].split("/")[1]]
+
+    if audio:
+        args += ["-c:a", audio.get("codec_name", "aac")]
+        if audio.get("sample_rate"):
+            args += ["-ar", audio["sample_rate"]]
+        if audio.get("channels"):
+            args += ["-ac", audio["channels"]]
+        if audio.get("bit_rate", "N/A") != "N/A":
+            args += ["-b:a", audio["bit_rate"]]
+    return args
+
+def encode_piece(start, end, piece_file, enc_args):
+    """Re-encode [start, end) frame-accurately."""
+    run_ffmpeg([
+        "ffmpeg", "-y", "-v", "error",
+        "-ss", f"{start:.6f}", "-i", input_file,
+        "-t", f"{end - start:.6f}",
+        *enc_args,
+        piece_file
+    ], check=True)
+
+def copy_piece(start, end, piece_file):
+    """Stream-copy [start, end); start must be a keyframe."""
+    run_ffmpeg([
+        "ffmpeg", "-y", "-v", "error",
+        "-ss", f"{start:.6f}", "-i", input_file,
+        "-t", f"{end - start:.6f}",
+        "-map", "0", "-c", "copy",
+        "-avoid_negative_ts", "make_zero",
+        piece_file
+    ], check=True)
+
+def plain_cut(start, end):
+    """Old behaviour: keyframe/packet accurate only, no re-encode."""
+    command = ["ffmpeg", "-y"]
+    if start:
+        command += ["-ss", str(start)]
+    command += ["-i", input_file]
+    if end is not None:
+        command += ["-t", str(end - (start or 0))]  # -t means duration
+    command += ["-c", "copy", output_file]  # copy without re-encoding
+    run_ffmpeg(command, check=True)
+
+def smart_cut(start, end):
+    start = start or 0.0
+    if end is None:
+        end = get_duration(input_file)
+    if end <= start:
+        raise Exception("❌ cut_end must be after cut_start.")
+
+    # First keyframe at/after start, last keyframe at/before end
+    head_keys = [k for k in find_keyframes(input_file, start) if k >= start - 0.0005]
+    tail_keys = [k for k in find_keyframes(input_file, end) if k <= end + 0.0005]
+    copy_start = head_keys[0] if head_keys else None
+    copy_end = tail_keys[-1] if tail_keys else None
+
+    enc_args = encoder_args(input_file)
+    pieces = []
+    try:
+        if copy_start is None or copy_end is None or copy_end <= copy_start:
+            # Poora cut ek hi GOP ke andar hai - sirf yehi hissa re-encode karo
+            print(f"✂️ Cut lies inside one GOP, re-encoding {end - start:.2f}s...")
+            encode_piece(start, end, "cut_part_0.mp4", enc_args)
+            pieces.append("cut_part_0.mp4")
+        else:
+            if copy_start - start > 0.0005:
+                print(f"🔧 Re-encoding head: {start:.3f}s -> {copy_start:.3f}s")
+                encode_piece(start, copy_start, "cut_part_0.mp4", enc_args)
+                pieces.append("cut_part_0.mp4")
+
+            print(f"📦 Copying keyframe range: {copy_start:.3f}s -> {copy_end:.3f}s")
+            copy_piece(copy_start, copy_end, "cut_part_1.mp4")
+            pieces.append("cut_part_1.mp4")
+
+            if end - copy_end > 0.0005:
+                print(f"🔧 Re-encoding tail: {copy_end:.3f}s -> {end:.3f}s")
+                encode_piece(copy_end, end, "cut_part_2.mp4", enc_args)
+                pieces.append("cut_part_2.mp4")
+
+        with open("cut_list.txt", "w") as f:
+            for piece in pieces:
+                f.write(f"file '{piece}'\n")
+
+        run_ffmpeg([
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "concat", "-safe", "0", "-i", "cut_list.txt",
+            "-map", "0", "-c", "copy",
+            "-movflags", "+faststart",
+            output_file
+        ], check=True)
+    finally:
+        # every part name, not just `pieces`: a failed encode leaves its file before it is appended
+        for piece in ["cut_part_0.mp4", "cut_part_1.mp4", "cut_part_2.mp4", "cut_list.txt"]:
+            if os.path.exists(piece):
+                os.remove(piece)
+
+def main():
+    start = parse_time(cut_start)
+    end = parse_time(cut_end)
+    try:
+        if SMART_CUT:
+            smart_cut(start, end)
+        else:
+            plain_cut(start, end)
+        print(f"Done! Video cut ho chuki hai: {output_file}")
+    except Exception as e:
+        print(f"⚠️ Error: {e}")
+
+if __name__ == "__main__":
+    main()
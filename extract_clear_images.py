@@ -1,41 +1,194 @@
 import os
-import cv2
+import math
+import bisect
 import shutil
 import subprocess
-import numpy as np
-from skimage.metrics import structural_similarity as ssim
+from ffmpeg_runner import run_ffmpeg
+
+# cv2 / numpy are imported inside the scoring functions, so scene detection
+# and frame extraction start without loading them.
 
 INPUT_VIDEO = "input.mp4"
 RAW_FRAMES_DIR = "raw_frames"
 CLEAR_FRAMES_DIR = "clear_scenes"
 SCENE_TIMESTAMPS_FILE = "scene_timestamps.txt"
+SCENE_ENGINE = "ffmpeg"                # "numpy": scenes + frame scores from one low-res decode (scene_stream.py)
+SCENE_THRESHOLD = 0.2
+TARGET_SCENES = None                  # e.g. 300: pick the threshold that gives about this many scenes
+MIN_SCENE_SPACING = 0                 # seconds; closer scene changes keep only the strongest one
+SCENE_SCORES_FILE = "scene_scores.txt"  # every frame's scene score, kept for re-picking
+USE_FRAME_STORE = False               # keep candidates decoded in one memory-mapped file (frame_store.py)
+FRAME_STORE = "candidate_frames"      # -> candidate_frames.npy + candidate_frames.json
+FRAME_WIDTH = 1280
+BLUR_THRESHOLD = 100.0
+BLACK_THRESHOLD = 10
+STREAM_BLUR_THRESHOLD = 30.0          # Laplacian variance at scene_stream.ANALYSIS_WIDTH
+STREAM_SCENE_THRESHOLD = 0.3          # SCENE_THRESHOLD for the numpy engine: its score (histogram distance
+                                      # + mean abs difference, 0..1) runs higher than ffmpeg's on motion
+CANDIDATE_WINDOW = 2.0                # seconds after a scene change to look for its best frame
+TOP_FRAMES = None                     # e.g. 200: no scene detection, keep the 200 best stills of the video
+MIN_FRAME_GAP = 5.0                   # seconds between TOP_FRAMES picks
+MIN_FRAME_DIFFERENCE = 0.1            # histogram distance (0..1) between TOP_FRAMES picks
+
+def scan_scene_scores():
+    """One decode: scene-change score of every frame, as [(pts_time, score), ...].
+
+    Saved in SCENE_SCORES_FILE and reused while the input is unchanged, so
+    trying a different TARGET_SCENES / MIN_SCENE_SPACING does not decode again.
+    """
+    stat = os.stat(INPUT_VIDEO)
+    source = f"{os.path.abspath(INPUT_VIDEO)} {stat.st_size} {stat.st_mtime_ns}"
+    stamp_file = SCENE_SCORES_FILE + ".src"
+    cached = False
+    if os.path.exists(stamp_file):
+        with open(stamp_file, "r") as f:
+            cached = f.read() == source
+
+    if not cached or not os.path.exists(SCENE_SCORES_FILE):
+        print("🔍 Scoring scene changes...")
+        tmp_file = SCENE_SCORES_FILE + ".tmp"
+        run_ffmpeg([
+            'ffmpeg', '-i', INPUT_VIDEO,
+            '-filter_complex', f'select=gte(scene\\,0),metadata=print:key=lavfi.scene_score:file={tmp_file}',
+            '-an', '-f', 'null', '-'
+        ], step="scene_scores", capture_stderr=True)
+        os.replace(tmp_file, SCENE_SCORES_FILE)
+        with open(stamp_file, "w") as f:
+            f.write(source)
+
+    # metadata=print writes "frame:N pts:P pts_time:T" then "lavfi.scene_score=S"
+    scores, pts_time = [], None
+    with open(SCENE_SCORES_FILE, "r") as f:
+        for line in f:
+            if "pts_time:" in line:
+                try:
+                    pts_time = float(line.split("pts_time:")[1].split()[0])
+                except (IndexError, ValueError):
+                    pts_time = None
+            elif line.startswith("lavfi.scene_score=") and pts_time is not None:
+                scores.append((pts_time, float(line.split("=", 1)[1])))
+    return scores
+
+def pick_scenes(scores, threshold=None):
+    """Scene starts from per-frame scores.
+
+    Strongest changes first; a change is dropped if a stronger one was already
+    kept within MIN_SCENE_SPACING seconds (non-maximum suppression). With
+    TARGET_SCENES set, the threshold is whatever score the last kept change has.
+    """
+    threshold = 0.0 if TARGET_SCENES else (SCENE_THRESHOLD if threshold is None else threshold)
+    kept, last_score = [], None  # kept stays sorted by time: only its two neighbours need checking
+    for pts_time, score in sorted(scores, key=lambda s: s[1], reverse=True):
+        if score <= threshold or (TARGET_SCENES and len(kept) >= TARGET_SCENES):
+            break
+        at = bisect.bisect_left(kept, pts_time)
+        if MIN_SCENE_SPACING and ((at < len(kept) and kept[at] - pts_time < MIN_SCENE_SPACING) or
+                                  (at > 0 and pts_time - kept[at - 1] < MIN_SCENE_SPACING)):
+            continue
+        kept.insert(at, pts_time)
+        last_score = score
+
+    if TARGET_SCENES and kept:
+        print(f"🎚️ Threshold for {TARGET_SCENES} scenes: {last_score:.3f}")
+    return kept
 
 def run_scene_detection():
     """Detect scenes and save timestamps."""
     if os.path.exists(SCENE_TIMESTAMPS_FILE):
         os.remove(SCENE_TIMESTAMPS_FILE)
 
-    print("🔍 Detecting scene changes...")
-    result = subprocess.run([
-        'ffmpeg', '-i', INPUT_VIDEO,
-        '-filter_complex', 'select=gt(scene\\,0.2),metadata=print',
-        '-an', '-f', 'null', '-'
-    ], stderr=subprocess.PIPE, text=True)
-
-    timestamps = []
-    for line in result.stderr.splitlines():
-        if "pts_time:" in line:
-            try:
-                time_str = line.split("pts_time:")[1].strip().split()[0]
-                timestamps.append(float(time_str))
-            except (IndexError, ValueError):
-                continue
+    if TARGET_SCENES or MIN_SCENE_SPACING:
+        timestamps = pick_scenes(scan_scene_scores())
+    else:
+        print("🔍 Detecting scene changes...")
+        result = run_ffmpeg([
+            'ffmpeg', '-i', INPUT_VIDEO,
+            '-filter_complex', f'select=gt(scene\\,{SCENE_THRESHOLD}),metadata=print',
+            '-an', '-f', 'null', '-'
+        ], step="scene_detection", check=False, capture_stderr=True)
+
+        timestamps = []
+        for line in result.stderr.splitlines():
+            if "pts_time:" in line:
+                try:
+                    time_str = line.split("pts_time:")[1].strip().split()[0]
+                    timestamps.append(float(time_str))
+                except (IndexError, ValueError):
+                    continue
 
+    save_timestamps(timestamps)
+
+def save_timestamps(timestamps):
     with open(SCENE_TIMESTAMPS_FILE, "w") as f:
         for ts in timestamps:
             f.write(f"{ts}\n")
     print(f"✅ Found {len(timestamps)} scenes.")
 
+def run_stream_analysis():
+    """SCENE_ENGINE = "numpy": scenes and frame quality from one low-res decode."""
+    import scene_stream
+    if os.path.exists(SCENE_TIMESTAMPS_FILE):
+        os.remove(SCENE_TIMESTAMPS_FILE)
+
+    analysis = scene_stream.analyze(INPUT_VIDEO)
+    timestamps = pick_scenes(analysis.scene_scores(), STREAM_SCENE_THRESHOLD)
+    save_timestamps(timestamps)
+    return analysis, timestamps
+
+def filter_best_from_analysis(analysis, timestamps):
+    """Best frame per scene from the stream scores; only the winners are decoded again."""
+    import numpy as np
+
+    if os.path.exists(CLEAR_FRAMES_DIR):
+        shutil.rmtree(CLEAR_FRAMES_DIR)
+    os.makedirs(CLEAR_FRAMES_DIR)
+
+    pts = analysis.pts
+    usable = (analysis.luma >= BLACK_THRESHOLD) & (analysis.sharpness >= STREAM_BLUR_THRESHOLD)
+    saved_count = 0
+    for idx, ts in enumerate(timestamps):
+        # Same 2 second window the JPEG path samples (10 frames, 0.2 sec apart)
+        lo, hi = np.searchsorted(pts, [ts, ts + CANDIDATE_WINDOW])
+        candidates = lo + np.flatnonzero(usable[lo:hi])
+        if not len(candidates):
+            continue
+        best = candidates[np.argmax(analysis.sharpness[candidates])]
+
+        if save_frame(pts[best], idx):
+            saved_count += 1
+
+    print(f"✅ Saved {saved_count} best clear images (one per scene).")
+
+def save_frame(pts_time, idx):
+    """Decode one frame at FRAME_WIDTH into clear_scenes/scene_XXXX.jpg; True if it was written."""
+    output_file = os.path.join(CLEAR_FRAMES_DIR, f"scene_{idx:04d}.jpg")
+    result = run_ffmpeg([
+        'ffmpeg', '-ss', str(pts_time),
+        '-i', INPUT_VIDEO,
+        '-frames:v', '1',
+        '-q:v', '2',
+        '-vf', f'scale={FRAME_WIDTH}:-1',
+        output_file,
+        '-y'
+    ], step=f"best scene_{idx:04d}", check=False, capture_stderr=True)
+    if result.returncode != 0 or not os.path.exists(output_file):
+        print(f"⚠️ Could not save frame at {pts_time:.2f}s (scene_{idx:04d})")
+        return False
+    return True
+
+def select_top_frames():
+    """TOP_FRAMES mode: best stills of the whole video, no scene detection."""
+    import scene_stream
+
+    if os.path.exists(CLEAR_FRAMES_DIR):
+        shutil.rmtree(CLEAR_FRAMES_DIR)
+    os.makedirs(CLEAR_FRAMES_DIR)
+
+    frames = scene_stream.top_frames(INPUT_VIDEO, TOP_FRAMES, MIN_FRAME_GAP, MIN_FRAME_DIFFERENCE,
+                                     BLACK_THRESHOLD, STREAM_BLUR_THRESHOLD)
+    saved_count = sum(save_frame(pts_time, idx) for idx, (pts_time, _) in enumerate(frames))
+    print(f"✅ Saved {saved_count} best clear images (top {TOP_FRAMES}).")
+
 def extract_multiple_frames(frames_per_scene=10):
     """Extract multiple frames around each scene timestamp."""
     if os.path.exists(RAW_FRAMES_DIR):
@@ -56,7 +209,7 @@ def extract_multiple_frames(frames_per_scene=10):
             capture_time = ts + offset
             output_filename = os.path.join(scene_folder, f"img_{i:02d}.jpg")
 
-            subprocess.run([
+            run_ffmpeg([
                 'ffmpeg', '-ss', str(capture_time),
                 '-i', INPUT_VIDEO,
                 '-frames:v', '1',
@@ -64,22 +217,111 @@ def extract_multiple_frames(frames_per_scene=10):
                 '-vf', 'scale=1280:-1',  # 1280px width, auto height
                 output_filename,
                 '-y'
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            ], step=f"frame scene_{idx:04d}/img_{i:02d}", check=False, capture_stderr=True)
 
     print(f"✅ Frames extracted for {len(timestamps)} scenes.")
 
-def is_blurry(image_path, threshold=100.0):
+def probe_frame_size():
+    """Candidate frame size: FRAME_WIDTH wide, height by aspect ratio (even)."""
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=width,height", "-of", "csv=p=0",
+        INPUT_VIDEO
+    ], capture_output=True, text=True, check=True)
+    width, height = map(int, result.stdout.strip().split(",")[:2])
+    return FRAME_WIDTH, int(round(FRAME_WIDTH * height / width / 2)) * 2
+
+def probe_duration():
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", INPUT_VIDEO
+    ], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def extract_frames_to_store(frames_per_scene=10):
+    """Like extract_multiple_frames, but one decode per scene straight into the frame store."""
+    from frame_store import FrameStore
+
+    with open(SCENE_TIMESTAMPS_FILE, "r") as f:
+        timestamps = [float(line.strip()) for line in f.readlines()]
+
+    width, height = probe_frame_size()
+    # Room for the frames really decoded: 5 fps from each scene start, cut short at the end of the video
+    duration = probe_duration()
+    capacity = sum(max(1, min(frames_per_scene, math.ceil((duration - ts) * 5))) for ts in timestamps)
+    store = FrameStore.create(FRAME_STORE, max(1, capacity), width, height)
+    print(f"🖼️ Decoding {frames_per_scene} frames per scene into {FRAME_STORE}.npy...")
+
+    try:
+        for idx, ts in enumerate(timestamps):
+            def read_frames(stream):
+                for i in range(frames_per_scene):
+                    # 0.2 sec difference between frames, same as the JPEG path
+                    if store.read_frame_from(stream, idx, i, ts + i * 0.2) is None:
+                        break
+
+            run_ffmpeg([
+                'ffmpeg', '-ss', str(ts),
+                '-i', INPUT_VIDEO,
+                '-vf', f'fps=5,scale={width}:{height}',
+                '-frames:v', str(frames_per_scene),
+                '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-'
+            ], step=f"frames scene_{idx:04d}", check=False, capture_stderr=True, stdout_reader=read_frames)
+    except BaseException:
+        store.remove()
+        raise
+
+    store.save_index()
+    print(f"✅ {len(store)} frames stored for {len(timestamps)} scenes.")
+    return store
+
+def filter_best_from_store(store):
+    """Score frames in place (zero-copy views) and encode only the best per scene."""
+    import cv2
+    import numpy as np
+
+    if os.path.exists(CLEAR_FRAMES_DIR):
+        shutil.rmtree(CLEAR_FRAMES_DIR)
+    os.makedirs(CLEAR_FRAMES_DIR)
+
+    saved_count = 0
+    for scene in store.scenes():
+        best_slot, best_score = None, -1
+        for slot in store.slots_for_scene(scene):
+            frame = store.frame(slot)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+            luma = np.mean(frame)
+            store.set_scores(slot, sharpness=sharpness, luma=luma)
+
+            if luma < BLACK_THRESHOLD or sharpness < BLUR_THRESHOLD:
+                continue
+            if sharpness > best_score:
+                best_slot, best_score = slot, sharpness
+
+        if best_slot is not None:
+            store.save_jpeg(best_slot, os.path.join(CLEAR_FRAMES_DIR, f"scene_{scene:04d}.jpg"))
+            saved_count += 1
+
+    store.save_index()
+    print(f"✅ Saved {saved_count} best clear images (one per scene).")
+
+def is_blurry(image_path, threshold=BLUR_THRESHOLD):
+    import cv2
     image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
     laplacian = cv2.Laplacian(image, cv2.CV_64F)
     score = laplacian.var()
     return score < threshold
 
-def is_black(image_path, threshold=10):
+def is_black(image_path, threshold=BLACK_THRESHOLD):
+    import cv2
+    import numpy as np
     image = cv2.imread(image_path)
     return np.mean(image) < threshold
 
 def select_best_image(scene_folder):
     """Select best image from a scene folder."""
+    import cv2
     images = sorted(os.listdir(scene_folder))
     best_score = -1
     best_image = None
@@ -127,9 +369,22 @@ def main():
     if not os.path.exists(INPUT_VIDEO):
         print(f"❌ Input video not found: {INPUT_VIDEO}")
         return
-    run_scene_detection()
-    extract_multiple_frames(frames_per_scene=10)
-    filter_best_images()
+    if TOP_FRAMES:
+        select_top_frames()
+    elif SCENE_ENGINE == "numpy":
+        analysis, timestamps = run_stream_analysis()
+        filter_best_from_analysis(analysis, timestamps)
+    elif USE_FRAME_STORE:
+        run_scene_detection()
+        store = extract_frames_to_store(frames_per_scene=10)
+        try:
+            filter_best_from_store(store)
+        finally:
+            store.remove()  # candidates are only needed until the best ones are saved
+    else:
+        run_scene_detection()
+        extract_multiple_frames(frames_per_scene=10)
+        filter_best_images()
     print("\n🧹 Done!")
 
 if __name__ == "__main__":
@@ -1,7 +1,11 @@
 import os
-import subprocess
 import random
+import subprocess
 import math
+import autotune
+import audio_bed
+import loudness
+from ffmpeg_runner import run_ffmpeg
 
 # CONFIGURATION
 IMAGE_FOLDER = "clear_scenes"      # Folder jahan images hain
@@ -9,6 +13,22 @@ OUTPUT_VIDEO = "last.mp4"          # Final output video name
 BACKGROUND_MUSIC = "voice.mp3"     # Background music file
 IMAGE_DURATION = 10                # Har image ka duration (seconds)
 TOTAL_DURATION = 2200              # Total video duration in seconds
+ENCODER = {"preset": "medium", "crf": 23, "threads": 0}  # x264 defaults
+ENCODE_BUDGET = None  # wall-clock seconds for the encode; set it to let autotune pick preset/CRF/threads
+NORMALIZE_LOUDNESS = True  # music at loudness.TARGET_LUFS instead of its native level
+
+def music_gain():
+    """dB to bring the music to loudness.TARGET_LUFS (measured once per file, cached)."""
+    return loudness.gain_db(loudness.measure(BACKGROUND_MUSIC)) if NORMALIZE_LOUDNESS else 0.0
+
+def get_video_duration(filename):
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        filename
+    ], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
 
 def create_slideshow():
     # Read all images from folder
@@ -30,14 +50,20 @@ def create_slideshow():
             f.write(f"file '{os.path.join(IMAGE_FOLDER, img)}'\n")
             f.write(f"duration {IMAGE_DURATION}\n")
 
+    inputs = ["-f", "concat", "-safe", "0", "-i", "images.txt"]
+    filters = ["-vf", "format=yuv420p"]     # Simple fast slideshow
+    encoder = ENCODER
+    if ENCODE_BUDGET:
+        encoder = autotune.tune(inputs, filters, TOTAL_DURATION, ENCODE_BUDGET, "slideshow-still")
+
     print("🎞️ Creating fast slideshow video (no zoom)...")
 
     # Step 1: Create slideshow video WITHOUT zoom/pan
-    subprocess.run([
+    run_ffmpeg([
         "ffmpeg", "-y",
-        "-f", "concat", "-safe", "0", "-i", "images.txt",
-        "-vf", "format=yuv420p",     # Simple fast slideshow
-        "-c:v", "libx264", "-pix_fmt", "yuv420p",
+        *inputs,
+        *filters,
+        "-c:v", "libx264", *autotune.encoder_args(encoder), "-pix_fmt", "yuv420p",
         "temp_video.mp4"
     ], check=True)
 
@@ -45,14 +71,16 @@ def create_slideshow():
 
     print("🎵 Adding background music...")
 
-    # Step 2: Add background music by looping it to match video
-    subprocess.run([
+    # Step 2: Add background music - loop is encoded once (cached) and repeated
+    # Bed as long as the video itself (whole images, may run past TOTAL_DURATION)
+    audio_bed.build(BACKGROUND_MUSIC, get_video_duration("temp_video.mp4"), "music_bed.aac", music_gain())
+    run_ffmpeg([
         "ffmpeg", "-y",
-        "-stream_loop", "-1", "-i", BACKGROUND_MUSIC,  # Loop background music
+        *audio_bed.input_args("music_bed.aac"),        # Looped background music
         "-i", "temp_video.mp4",                        # Input video
+        "-map", "1:v", "-map", "0:a",
         "-shortest",                                   # Trim audio if longer
-        "-c:v", "copy",                                # No re-encode
-        "-c:a", "aac", "-b:a", "192k",                 # Audio quality
+        "-c", "copy",                                  # No re-encode
         OUTPUT_VIDEO
     ], check=True)
 
@@ -67,8 +95,9 @@ def main():
     except Exception as e:
         print(f"⚠️ Error: {e}")
     finally:
-        if os.path.exists("images.txt"):
-            os.remove("images.txt")
+        for f in ["images.txt", "music_bed.aac"]:
+            if os.path.exists(f):
+                os.remove(f)
 
 if __name__ == "__main__":
     main()
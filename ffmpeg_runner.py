@@ -0,0 +1,229 @@
+import io
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+import governor
+from datetime import datetime, timezone
+
+# Common runner for every ffmpeg call. Adds `-progress pipe:1`, shows live
+# frame / fps / speed, and appends one JSON line per call to METRICS_FILE with
+# wall time, CPU time and peak RSS of the ffmpeg process.
+#
+#   FFMPEG_METRICS=/path/metrics.jsonl   where to write (default below)
+#   FFMPEG_STAGE=slideshow               pipeline stage name (set by pipeline.py)
+#
+# Every call also goes through governor.py, which queues it while the machine
+# is short of memory and picks its -threads from the CPUs left over.
+
+METRICS_FILE = "ffmpeg_metrics.jsonl"
+PROGRESS_LOG_INTERVAL = 10  # seconds between progress samples in the metrics file
+PROGRESS_KEYS = ("frame", "fps", "bitrate", "total_size", "out_time", "speed")
+
+_metrics_lock = threading.Lock()
+
+def metrics_path():
+    return os.environ.get("FFMPEG_METRICS", METRICS_FILE)
+
+def write_metric(record):
+    record.setdefault("time", datetime.now(timezone.utc).isoformat(timespec="milliseconds"))
+    with _metrics_lock:
+        with open(metrics_path(), "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+def parse_progress(progress):
+    """Turn ffmpeg's key=value strings into numbers where it makes sense."""
+    parsed = {}
+    for key in PROGRESS_KEYS:
+        value = progress.get(key)
+        if value in (None, "N/A"):
+            continue
+        if key in ("frame", "total_size"):
+            parsed[key] = int(value)
+        elif key == "fps":
+            parsed[key] = float(value)
+        elif key == "speed":
+            parsed[key] = float(value.rstrip("x")) if value.rstrip("x") else None
+        elif key == "bitrate":
+            parsed["bitrate_kbps"] = float(value.replace("kbits/s", "")) if "kbits/s" in value else None
+        elif key == "out_time":
+            parsed["out_time"] = value
+    us = progress.get("out_time_us") or progress.get("out_time_ms")  # both are microseconds
+    if us not in (None, "N/A"):
+        parsed["out_time_s"] = int(us) / 1_000_000
+    return parsed
+
+def show_progress(step, parsed):
+    line = (f"⏳ {step}: frame={parsed.get('frame', 0)} fps={parsed.get('fps', 0):.1f} "
+            f"time={parsed.get('out_time_s', 0):.1f}s speed={parsed.get('speed') or 0:.2f}x")
+    if sys.stdout.isatty():
+        print("\r" + line.ljust(78), end="", flush=True)
+
+def _wait(proc):
+    """Reap ffmpeg and return its rusage (None where wait4 is not available)."""
+    if not hasattr(os, "wait4"):
+        proc.wait()
+        return None
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage
+
+def _read_progress(stream, step, started, on_progress):
+    """Follow ffmpeg's -progress output; returns the last parsed block."""
+    progress, parsed, last_logged = {}, {}, started
+    for line in stream:
+        key, _, value = line.strip().partition("=")
+        if not key:
+            continue
+        progress[key] = value
+        if key == "progress":
+            parsed = parse_progress(progress)
+            show_progress(step, parsed)
+            if on_progress:
+                on_progress(parsed)
+            now = time.perf_counter()
+            if now - last_logged >= PROGRESS_LOG_INTERVAL and value != "end":
+                write_metric({"type": "progress", "stage": os.environ.get("FFMPEG_STAGE"),
+                              "step": step, "elapsed_s": round(now - started, 3), **parsed})
+                last_logged = now
+    return parsed
+
+def run_ffmpeg(cmd, step=None, check=True, capture_stderr=False, on_progress=None, stdout_reader=None,
+               stdin_writer=None):
+    """Drop-in for subprocess.run(["ffmpeg", ...]) with progress and metrics.
+
+    capture_stderr=True keeps ffmpeg's log off the terminal and returns it as
+    result.stderr (use it where the old code sent output to DEVNULL or parsed it).
+    stdout_reader(stream) is for commands that write data to pipe:1 (e.g. raw
+    frames); progress then goes through a separate pipe.
+    stdin_writer(stream) feeds pipe:0 (e.g. generated raw frames) from a thread.
+    """
+    step = step or os.path.basename(cmd[-2] if cmd[-1] == "-y" else cmd[-1])
+    ticket = None
+    if governor.enabled():
+        ticket = governor.admit(step)
+        cmd = governor.apply_threads(cmd, ticket["threads"])
+    progress_r = progress_w = None
+    if stdout_reader:
+        progress_r, progress_w = os.pipe()
+        target = f"pipe:{progress_w}"
+    else:
+        target = "pipe:1"
+    command = [cmd[0], "-progress", target, "-nostats"] + list(cmd[1:])
+
+    started_wall = time.time()
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            command, stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE if stdin_writer else None,
+            stderr=subprocess.PIPE if capture_stderr else None,
+            pass_fds=(progress_w,) if progress_w is not None else ()
+        )
+    except OSError:
+        if ticket:
+            governor.finished(ticket, None)
+        raise
+    if ticket:
+        governor.started(ticket, proc.pid)
+
+    # stderr ko alag thread mein padho warna pipe bhar kar ffmpeg atak jata hai
+    stderr_lines = []
+    reader = None
+    if capture_stderr:
+        reader = threading.Thread(target=lambda: stderr_lines.extend(proc.stderr), daemon=True)
+        reader.start()
+
+    writer_errors = []
+    writer = None
+    if stdin_writer:
+        def feed():
+            try:
+                stdin_writer(proc.stdin)
+            except BrokenPipeError:
+                pass  # ffmpeg exited early; its return code says why
+            except Exception as e:
+                writer_errors.append(e)
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+
+    # Whatever happens while reading, ffmpeg is reaped, the governor ticket
+    # released and the metric written - a crashed reader must not leave a
+    # zombie ffmpeg or a ticket that blocks other processes' admission.
+    parsed = {}
+    completed = False
+    try:
+        if stdout_reader:
+            os.close(progress_w)
+            result = {}
+            stream = io.TextIOWrapper(io.FileIO(progress_r, "r"), errors="replace")
+            follower = threading.Thread(
+                target=lambda: result.update(parsed=_read_progress(stream, step, started, on_progress)),
+                daemon=True
+            )
+            follower.start()
+            try:
+                stdout_reader(proc.stdout)
+            finally:
+                proc.stdout.close()  # ffmpeg stops if the reader gave up early
+                follower.join()
+                stream.close()
+            parsed = result.get("parsed", {})
+        else:
+            parsed = _read_progress(io.TextIOWrapper(proc.stdout, errors="replace"), step, started, on_progress)
+        completed = True
+    finally:
+        if not completed:
+            proc.kill()  # the reader is gone; nobody drains ffmpeg's pipes any more
+        if writer:
+            writer.join()
+        usage = _wait(proc)
+        wall = time.perf_counter() - started
+        # ru_maxrss is KB on Linux, bytes on macOS
+        rss = None
+        if usage is not None:
+            rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        if ticket:
+            governor.finished(ticket, rss)
+        if reader:
+            reader.join()
+        if parsed and sys.stdout.isatty():
+            print()
+
+        record = {
+            "type": "ffmpeg",
+            "stage": os.environ.get("FFMPEG_STAGE"),
+            "step": step,
+            "script": os.path.basename(sys.argv[0]),
+            "started": datetime.fromtimestamp(started_wall, timezone.utc).isoformat(timespec="milliseconds"),
+            "wall_s": round(wall, 3),
+            "returncode": proc.returncode,
+            "cmd": command,
+            **parsed,
+        }
+        if ticket:
+            record["threads"] = ticket["threads"]
+        if usage is not None:
+            record.update({
+                "user_s": round(usage.ru_utime, 3),
+                "sys_s": round(usage.ru_stime, 3),
+                "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+                "peak_rss_bytes": rss,
+            })
+            if wall > 0:
+                record["cpu_util"] = round(record["cpu_s"] / wall, 2)
+        write_metric(record)
+
+    stderr = b"".join(stderr_lines).decode(errors="replace") if capture_stderr else None
+    if writer_errors:
+        raise writer_errors[0]
+    if check and proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, command, stderr=stderr)
+    return subprocess.CompletedProcess(command, proc.returncode, None, stderr)
@@ -1,10 +1,17 @@
 import os
 import subprocess
+import autotune
+import segmented
+import verify
+from ffmpeg_runner import run_ffmpeg
 
 # Input videos
 VIDEOS_TO_MERGE = ["new.mp4", "last.mp4"]
 FINAL_VIDEO = "final_output.mp4"
 TEMP_FILE = "temp_list.txt"
+ENCODER = {"preset": "medium", "crf": 20, "threads": 0}
+ENCODE_BUDGET = None  # wall-clock seconds for all normalizing encodes; set it to let autotune pick preset/CRF/threads
+OUTPUT_MODE = "mp4"  # "mp4", "fmp4" or "hls" (see segmented.py) - usable while still rendering
 
 def check_videos_exist():
     missing_videos = [v for v in VIDEOS_TO_MERGE if not os.path.exists(v)]
@@ -23,23 +30,57 @@ def get_video_duration(filename):
         raise Exception(f"Couldn't get duration for {filename}: {result.stderr}")
     return float(result.stdout.strip())
 
-def normalize_video(input_file, output_file):
+def normalize_video(input_file, output_file, encoder=ENCODER, output_args=None):
     """Re-encode video and audio with synced durations to avoid pitch issues"""
     print(f"🔄 Re-encoding {input_file} with synced audio/video...")
-    subprocess.run([
+    # Temp files are only concatenated, so no +faststart rewrite here
+    output_args = output_args or [output_file]
+    run_ffmpeg([
         "ffmpeg", "-y", "-i", input_file,
         "-r", "30",                      # Normalize frame rate
         "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "20",
+        *autotune.encoder_args(encoder),
         "-c:a", "aac",
         "-b:a", "192k",
         "-ar", "48000",                  # ✅ Force 48kHz for MP4 standard
         "-ac", "2",                      # ✅ Stereo
-        "-movflags", "+faststart",
         "-pix_fmt", "yuv420p",
-        output_file
-    ], check=True)
+        *output_args
+    ], step=os.path.basename(output_file), check=True)
+
+def pick_encoder(i, durations):
+    if not ENCODE_BUDGET:
+        return ENCODER
+    # Budget ko har video ki length ke hisaab se baanto
+    budget = ENCODE_BUDGET * durations[i] / sum(durations)
+    return autotune.tune(["-i", VIDEOS_TO_MERGE[i]], ["-r", "30"], durations[i], budget, "normalize-30fps")
+
+def check_output(durations):
+    """Packet-level check of the merged file: length, gaps at each join, A/V offset."""
+    joins, total = [], 0.0
+    for duration in durations[:-1]:
+        total += duration
+        joins.append(round(total, 3))
+    print()
+    found = verify.verify(FINAL_VIDEO, expected_duration=sum(durations), joins=joins)
+    if not found:
+        print(f"🎉 Final video verified: {FINAL_VIDEO}")
+
+def merge_videos_segmented():
+    """HLS mode: every input is normalized straight into one growing playlist."""
+    print("🔀 Normalizing into HLS segments (playable while encoding)...")
+    durations = [get_video_duration(v) for v in VIDEOS_TO_MERGE]
+    offset = 0.0
+    for i, video in enumerate(VIDEOS_TO_MERGE):
+        # Har agla video pichhle ke end se timestamps continue karta hai
+        normalize_video(video, FINAL_VIDEO, pick_encoder(i, durations), output_args=[
+            *segmented.keyframe_args(),
+            *segmented.output_args(FINAL_VIDEO, "hls", append=i > 0, ts_offset=offset)
+        ])
+        offset += durations[i]
+
+    segmented.finalize(FINAL_VIDEO, "hls")
+    check_output(durations)
 
 def merge_videos():
     print("🔀 Merging with accurate durations...")
@@ -47,17 +88,18 @@ def merge_videos():
     # Normalize all videos first
     temp_files = []
     try:
+        durations = [get_video_duration(v) for v in VIDEOS_TO_MERGE]
         for i, video in enumerate(VIDEOS_TO_MERGE):
             temp_file = f"normalized_{i}.mp4"
-            normalize_video(video, temp_file)
+            normalize_video(video, temp_file, pick_encoder(i, durations))
             temp_files.append(temp_file)
         
         # Verify normalized durations
         print("\n✅ Normalized Video Durations:")
-        total_duration = 0
+        normalized_durations = []
         for temp_file in temp_files:
             duration = get_video_duration(temp_file)
-            total_duration += duration
+            normalized_durations.append(duration)
             mins, secs = divmod(duration, 60)
             hours, mins = divmod(mins, 60)
             print(f"  {temp_file}: {int(hours):02d}:{int(mins):02d}:{int(secs):02d}")
@@ -68,20 +110,17 @@ def merge_videos():
                 f.write(f"file '{temp_file}'\n")
         
         # Merge with accurate concatenation
-        subprocess.run([
+        run_ffmpeg([
             "ffmpeg", "-y",
             "-f", "concat",
             "-safe", "0",
             "-i", TEMP_FILE,
             "-c", "copy",               # Stream copy for faster merging
             "-fflags", "+genpts",       # Ensure proper timestamps
-            FINAL_VIDEO
+            *segmented.output_args(FINAL_VIDEO, OUTPUT_MODE)
         ], check=True)
         
-        # Verify final duration
-        final_duration = get_video_duration(FINAL_VIDEO)
-        print(f"\n🎉 Final duration: {final_duration:.2f}s (Expected: {total_duration:.2f}s)")
-        print(f"   Difference: {final_duration-total_duration:.2f}s")
+        check_output(normalized_durations)
         
     finally:
         # Cleanup
@@ -91,13 +130,19 @@ def merge_videos():
         if os.path.exists(TEMP_FILE):
             os.remove(TEMP_FILE)
 
-if __name__ == "__main__":
+def main():
     try:
         check_videos_exist()
-        merge_videos()
+        if OUTPUT_MODE == "hls":
+            merge_videos_segmented()
+        else:
+            merge_videos()
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
         print("Try these solutions:")
         print("1. Check each video plays properly in VLC/MPV")
         print("2. Convert problematic videos separately first:")
-        print("   ffmpeg -i problem.mp4 -r 30 -c:v libx264 -crf 22 -c:a aac fixed.mp4")
\ No newline at end of file
+        print("   ffmpeg -i problem.mp4 -r 30 -c:v libx264 -crf 22 -c:a aac fixed.mp4")
+
+if __name__ == "__main__":
+    main()
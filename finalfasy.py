@@ -1,5 +1,6 @@
 import os
 import subprocess
+from ffmpeg_runner import run_ffmpeg
 
 # Input videos
 VIDEOS_TO_MERGE = ["final_output1.mp4", "last.mp4"]
@@ -32,7 +33,7 @@ def merge_videos_directly():
             f.write(f"file '{os.path.abspath(video)}'\n")
 
     # Merge videos
-    subprocess.run([
+    run_ffmpeg([
         "ffmpeg", "-y",
         "-f", "concat",
         "-safe", "0",
@@ -50,7 +51,7 @@ def merge_videos_directly():
     if os.path.exists(TEMP_FILE):
         os.remove(TEMP_FILE)
 
-if __name__ == "__main__":
+def main():
     try:
         check_videos_exist()
         merge_videos_directly()
@@ -60,3 +61,6 @@ if __name__ == "__main__":
         print("1. Ensure all videos have same codec, resolution, framerate, etc.")
         print("2. If not, convert them first using:")
         print("   ffmpeg -i input.mp4 -r 30 -c:v libx264 -crf 22 -c:a aac output_fixed.mp4")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import json
+import numpy as np
+
+# Decoded candidate frames in one memory-mapped array file instead of
+# thousands of small JPEGs under raw_frames/.
+#
+#   <name>.npy   - uint8 array (capacity, height, width, 3), BGR like cv2
+#   <name>.json  - index: one entry per stored frame
+#                  {"scene": 12, "offset": 3, "pts": 81.6, "scores": {...}}
+#
+# Frames are written straight from ffmpeg's rawvideo output into the map and
+# read back as zero-copy numpy views, so scoring and dedup never decode a JPEG.
+# Only the final selections get encoded (see save_jpeg).
+
+class FrameStore:
+    def __init__(self, path, array, index):
+        self.path = path
+        self.array = array
+        self.index = index
+        self._slots = {}  # scene -> [slot, ...]
+        for slot, entry in enumerate(index):
+            self._slots.setdefault(entry["scene"], []).append(slot)
+
+    @classmethod
+    def create(cls, path, capacity, width, height):
+        """New store with room for `capacity` frames of width x height."""
+        array = np.lib.format.open_memmap(path + ".npy", mode="w+", dtype=np.uint8,
+                                          shape=(capacity, height, width, 3))
+        return cls(path, array, [])
+
+    @classmethod
+    def open(cls, path, writable=False):
+        array = np.load(path + ".npy", mmap_mode="r+" if writable else "r")
+        with open(path + ".json", "r") as f:
+            index = json.load(f)
+        return cls(path, array, index)
+
+    @property
+    def frame_bytes(self):
+        return self.array.shape[1] * self.array.shape[2] * 3
+
+    def __len__(self):
+        return len(self.index)
+
+    def read_frame_from(self, stream, scene, offset, pts):
+        """Read one raw bgr24 frame from a stream directly into the next slot.
+
+        Returns the slot number, or None when the stream ended first.
+        """
+        slot = len(self.index)
+        if slot >= self.array.shape[0]:
+            raise Exception(f"❌ Frame store full ({self.array.shape[0]} frames)")
+        view = memoryview(self.array[slot]).cast("B")
+        got = 0
+        while got < len(view):
+            n = stream.readinto(view[got:])
+            if not n:
+                return None
+            got += n
+        self.index.append({"scene": scene, "offset": offset, "pts": pts, "scores": {}})
+        self._slots.setdefault(scene, []).append(slot)
+        return slot
+
+    def frame(self, slot):
+        """Zero-copy view of a stored frame (height, width, 3)."""
+        return self.array[slot]
+
+    def slots_for_scene(self, scene):
+        return list(self._slots.get(scene, []))
+
+    def scenes(self):
+        return sorted(self._slots)
+
+    def set_scores(self, slot, **scores):
+        self.index[slot]["scores"].update({k: float(v) for k, v in scores.items()})
+
+    def save_index(self):
+        self.array.flush()
+        with open(self.path + ".json.tmp", "w") as f:
+            json.dump(self.index, f)
+        os.replace(self.path + ".json.tmp", self.path + ".json")
+
+    def save_jpeg(self, slot, output_file, quality=95):
+        import cv2
+        cv2.imwrite(output_file, self.frame(slot), [cv2.IMWRITE_JPEG_QUALITY, quality])
+
+    def remove(self):
+        self.array = None  # drop the map before deleting its file
+        for suffix in (".npy", ".json"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
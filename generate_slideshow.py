@@ -1,8 +1,6 @@
 import os
 import random
 import subprocess
-from moviepy.editor import VideoFileClip, ImageClip, concatenate_videoclips, CompositeVideoClip
-from moviepy.video.fx.all import crop
 
 IMAGES_DIR = "clear_scenes"
 ALL_IMAGES_DIR = "all"
@@ -16,7 +14,10 @@ LONG_DURATION_IMAGE = 40
 SHORT_DURATION_IMAGE = 10
 GIF_URL = "https://www.behance.net/gallery/68481015/GIF-Loader/modules/400188135"  # For demonstration; you'll need to download it
 
+# moviepy.editor is slow to import, so it is loaded inside the functions that use it
+
 def get_random_cuts_from_video(video_path, total_duration, clip_duration):
+    from moviepy.editor import VideoFileClip
     try:
         video = VideoFileClip(video_path)
         video_duration = video.duration
@@ -33,6 +34,7 @@ def get_random_cuts_from_video(video_path, total_duration, clip_duration):
         return []
 
 def get_image_clips(image_dir, duration):
+    from moviepy.editor import ImageClip
     image_files = sorted(os.listdir(image_dir))
     if not image_files:
         print(f"⚠️ No images found in {image_dir}.")
@@ -41,6 +43,7 @@ def get_image_clips(image_dir, duration):
     return clips
 
 def get_random_image_clips(image_dir, num_clips, duration):
+    from moviepy.editor import ImageClip
     image_files = os.listdir(image_dir)
     if not image_files:
         print(f"⚠️ No images found in {image_dir}.")
@@ -58,6 +61,7 @@ def download_gif(url, filename="loading.gif"):
         return None
 
 def main():
+    from moviepy.editor import VideoFileClip, ImageClip, concatenate_videoclips, CompositeVideoClip
     final_clips = []
 
     # Part 1: Random cuts from input video
@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no shared lock, governor stays off
+    fcntl = None
+
+# Machine-wide governor for ffmpeg jobs, shared by every script, pipeline stage
+# and batch worker on this box (they are separate processes, so the bookkeeping
+# lives in files under REGISTRY_DIR, guarded by a lock file).
+#
+# Before run_ffmpeg starts a job it asks admit():
+#   - memory: the job's expected peak RSS (largest seen for this stage/step,
+#     kept in HISTORY_FILE) must fit in MemAvailable minus what running jobs
+#     are still expected to grow into, leaving MEMORY_RESERVE free. If not,
+#     the job waits until it does; a job alone on the machine always starts.
+#   - threads: CPU_BUDGET minus what the running jobs use (measured from
+#     /proc once they have run a few seconds, their assigned threads before),
+#     but at least an equal share of CPU_BUDGET.
+#
+#   FFMPEG_GOVERNOR=0    turn it off (ffmpeg picks its own threads again)
+
+REGISTRY_DIR = os.path.join(tempfile.gettempdir(), "vts_governor")
+HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".cache", "video_to_slideshow", "governor.json")
+CPU_BUDGET = os.cpu_count() or 1
+MEMORY_RESERVE = 0.10        # fraction of RAM to leave free
+DEFAULT_RSS = 512 * 1024 * 1024  # expected peak RSS of a job never seen before
+MEASURE_AFTER = 5.0          # seconds before a job's measured CPU use replaces its assigned threads
+POLL_SECONDS = 2.0
+
+def enabled():
+    return fcntl is not None and os.environ.get("FFMPEG_GOVERNOR", "1") != "0"
+
+class _Lock:
+    def __enter__(self):
+        os.makedirs(REGISTRY_DIR, exist_ok=True)
+        self.file = open(os.path.join(REGISTRY_DIR, "lock"), "w")
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+def meminfo():
+    """(MemTotal, MemAvailable) in bytes, or None without /proc."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            values = {line.split(":")[0]: int(line.split()[1]) * 1024 for line in f}
+        return values["MemTotal"], values["MemAvailable"]
+    except (OSError, KeyError, ValueError):
+        return None
+
+def proc_usage(pid):
+    """(cpu seconds, current RSS bytes) of a process, or None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        cpu = (int(fields[11]) + int(fields[12])) / ticks
+        rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        return cpu, rss
+    except (OSError, IndexError, ValueError):
+        return None
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+def job_key(step):
+    # Stage name like the metrics use: under pipeline.py every stage's argv[0] is pipeline.py
+    owner = os.environ.get("FFMPEG_STAGE") or os.path.basename(sys.argv[0])
+    return f"{owner}:{(step or '').split(' ')[0]}"
+
+_peaks = {}  # history as this process last saw it, so finished() skips no-op rewrites
+
+def load_history():
+    history = {}
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "r") as f:
+            history = json.load(f)
+    _peaks.update(history)
+    return history
+
+def running_jobs():
+    """Registered jobs, dropping ones whose owner or ffmpeg has exited."""
+    jobs = []
+    for name in os.listdir(REGISTRY_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(REGISTRY_DIR, name)
+        try:
+            with open(path, "r") as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not alive(job["owner"]) or (job.get("pid") and not alive(job["pid"])):
+            os.remove(path)
+            continue
+        jobs.append(job)
+    return jobs
+
+def job_load(job, now):
+    """(CPUs in use, bytes the job may still grow by) for a running job."""
+    usage = proc_usage(job["pid"]) if job.get("pid") else None
+    if usage is None:
+        return job["threads"], job["expected_rss"]
+    cpu, rss = usage
+    elapsed = now - job["started"]
+    cpus = cpu / elapsed if elapsed >= MEASURE_AFTER else job["threads"]
+    return cpus, max(0, job["expected_rss"] - rss)
+
+def admit(step):
+    """Wait for room on the machine; returns a ticket dict with the job's thread count."""
+    key = job_key(step)
+    waited = False
+    while True:
+        with _Lock():
+            expected = load_history().get(key, DEFAULT_RSS)
+            jobs = running_jobs()
+            now = time.time()
+            loads = [job_load(job, now) for job in jobs]
+            free_cpus = CPU_BUDGET - sum(cpus for cpus, _ in loads)
+            fits_memory = True
+            memory = meminfo()
+            if memory:
+                total, available = memory
+                growth = sum(grow for _, grow in loads)
+                fits_memory = available - growth - expected >= total * MEMORY_RESERVE
+
+            if not jobs or fits_memory:
+                # What is left, but never less than an equal share of the machine
+                threads = max(1, min(CPU_BUDGET, max(int(free_cpus), CPU_BUDGET // (len(jobs) + 1))))
+                ticket = {"owner": os.getpid(), "pid": None, "key": key, "threads": threads,
+                          "expected_rss": expected, "started": now,
+                          "file": os.path.join(REGISTRY_DIR, f"{os.getpid()}-{time.monotonic_ns()}.json")}
+                _write(ticket)
+                if waited:
+                    print(f"🚦 {step}: admitted with {threads} threads")
+                return ticket
+
+        if not waited:
+            print(f"🚦 {step}: waiting for memory ({len(jobs)} ffmpeg jobs running)")
+            waited = True
+        time.sleep(POLL_SECONDS)
+
+def started(ticket, pid):
+    ticket["pid"] = pid
+    ticket["started"] = time.time()
+    with _Lock():
+        _write(ticket)
+
+def finished(ticket, peak_rss):
+    """Drop the job from the registry and remember its peak RSS for next time."""
+    with _Lock():
+        if os.path.exists(ticket["file"]):
+            os.remove(ticket["file"])
+        # Only a new peak is written (short calls like save_frame rarely set one)
+        if peak_rss and peak_rss > _peaks.get(ticket["key"], 0):
+            history = load_history()
+            if peak_rss > history.get(ticket["key"], 0):
+                history[ticket["key"]] = peak_rss
+                _peaks[ticket["key"]] = peak_rss
+                os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+                with open(HISTORY_FILE + ".tmp", "w") as f:
+                    json.dump(history, f, indent=2, sort_keys=True)
+                os.replace(HISTORY_FILE + ".tmp", HISTORY_FILE)
+
+def _write(ticket):
+    with open(ticket["file"] + ".tmp", "w") as f:
+        json.dump(ticket, f)
+    os.replace(ticket["file"] + ".tmp", ticket["file"])
+
+def output_starts(cmd):
+    """Indexes where the 2nd, 3rd... output's options begin: the "-map" right after
+    an output file (`... -pix_fmt yuv420p out_480p.mp4 -map [r1out] ...`, the
+    layout renditions.output_args writes)."""
+    inputs = [i for i, arg in enumerate(cmd) if arg == "-i"]
+    first = inputs[-1] + 2 if inputs else 1
+    return [i for i in range(max(first, 3), len(cmd))
+            if cmd[i] == "-map" and not cmd[i - 1].startswith("-") and not cmd[i - 2].startswith("-")]
+
+def apply_threads(cmd, threads):
+    """Add -threads to every output unless the command already sets it.
+
+    With several outputs (extra renditions) the job's threads are shared
+    between their encoders, so together they stay within what admit() gave.
+    """
+    if "-threads" in cmd:
+        return list(cmd)
+    cmd = list(cmd)
+    starts = output_starts(cmd)
+    share = str(max(1, threads // (len(starts) + 1)))
+    at = len(cmd) - 1
+    while at > 1 and cmd[at] == "-y":
+        at -= 1
+    cmd = cmd[:at] + ["-threads", share] + cmd[at:]
+    for start in reversed(starts):
+        # the option before each later output's file belongs to the output ending there
+        cmd = cmd[:start - 1] + ["-threads", share] + cmd[start - 1:]
+    return cmd
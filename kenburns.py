@@ -0,0 +1,154 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import renditions
+from ffmpeg_runner import run_ffmpeg
+
+# Ken Burns slideshow clips without zoompan.
+#
+# zoompan re-scales the full image for every output frame, rounds the crop to
+# whole pixels (visible jitter on slow zooms) and, fed from the concat demuxer,
+# restarts its zoom in odd places. Here instead:
+#   - the whole zoom / pan path of a clip is computed up front (trajectory())
+#   - each image is decoded once, resized to the size its deepest zoom needs
+#     (so the last frame is 1:1, never upscaled), and kept in memory
+#   - every frame is one cv2.warpAffine of that image with a float matrix, so
+#     the crop moves in subpixel steps, and goes to ffmpeg as raw BGR on stdin
+#   - a clip depends only on (image, duration, settings), so each unique one
+#     is encoded once into CLIP_FOLDER and re-used for every placement; the
+#     slideshow is a stream-copy concat of clips
+#   - extra renditions (see renditions.py) split the same generated frames, so
+#     they cost only their own scale and encode
+#
+# cv2 / numpy are imported inside the render functions, so importing this
+# module (e.g. from last.py in zoompan mode) does not need them.
+
+WIDTH = 1280
+HEIGHT = 720
+FPS = 30
+ZOOM_RATE = 0.0005  # zoom added per frame, same speed as the old zoompan filter
+MAX_ZOOM = 1.5      # long clips stop zooming here
+CLIP_FOLDER = "kenburns_clips"
+CLIP_JOBS = 2       # clips rendered at the same time (warpAffine releases the GIL)
+
+def clip_dir(output_file):
+    return os.path.splitext(output_file)[0] + "_kenburns"
+
+def frame_count(seconds):
+    return max(1, int(round(seconds * FPS)))
+
+def end_zoom(frames):
+    return min(MAX_ZOOM, 1 + ZOOM_RATE * frames)
+
+def trajectory(frames, center=(0.5, 0.5)):
+    """Per-frame zoom and view centre (fractions of the image) as float arrays.
+
+    Zoom grows geometrically, which looks like constant speed (a linear zoom
+    seems to slow down as it goes).
+    """
+    import numpy as np
+    zoom = np.exp(np.linspace(0.0, np.log(end_zoom(frames)), frames))
+    cx = np.full(frames, center[0])
+    cy = np.full(frames, center[1])
+    return zoom, cx, cy
+
+def load_image(image_path, frames):
+    """Decode once, stretched to 16:9 (like scale=1280:720) at the clip's deepest zoom."""
+    import cv2
+    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if image is None:
+        raise Exception(f"❌ Could not read image: {image_path}")
+    scale = end_zoom(frames)
+    size = (int(round(WIDTH * scale)), int(round(HEIGHT * scale)))
+    shrinking = image.shape[1] >= size[0] and image.shape[0] >= size[1]
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_CUBIC)
+
+def affine_matrices(source_shape, zoom, cx, cy):
+    """(frames, 2, 3) matrices mapping the source image onto the output frame."""
+    import numpy as np
+    src_height, src_width = source_shape[:2]
+    kx = WIDTH * zoom / src_width    # output pixels per source pixel
+    ky = HEIGHT * zoom / src_height
+    matrices = np.zeros((len(zoom), 2, 3), np.float64)
+    matrices[:, 0, 0] = kx
+    matrices[:, 1, 1] = ky
+    # pixel centres: source point (cx * w - 0.5) lands on the output centre
+    matrices[:, 0, 2] = (WIDTH - 1) / 2 - kx * (cx * src_width - 0.5)
+    matrices[:, 1, 2] = (HEIGHT - 1) / 2 - ky * (cy * src_height - 0.5)
+    return matrices
+
+def clip_key(image_path, seconds, encode_args):
+    st = os.stat(image_path)
+    text = "|".join(map(str, [
+        os.path.abspath(image_path), st.st_size, st.st_mtime_ns, seconds,
+        WIDTH, HEIGHT, FPS, ZOOM_RATE, MAX_ZOOM, encode_args
+    ]))
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+def render_clip(image_path, seconds, output_file, encode_args, extra=(), encoder=None):
+    """One clip; extra renditions (specs) are encoded with encoder from the same frames.
+
+    If output_file already exists only the renditions are written.
+    """
+    import cv2
+    import numpy as np
+    frames = frame_count(seconds)
+    source = load_image(image_path, frames)
+    matrices = affine_matrices(source.shape, *trajectory(frames))
+    frame = np.empty((HEIGHT, WIDTH, 3), np.uint8)
+
+    def write_frames(stream):
+        for matrix in matrices:
+            cv2.warpAffine(source, matrix, (WIDTH, HEIGHT), dst=frame,
+                           flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+            stream.write(frame.data)
+
+    partial = output_file + ".partial.mp4"
+    main = not os.path.exists(output_file)
+    filters, main_maps = renditions.fan_out([], extra, main=main)
+    # stdin ends after `frames` frames, so no output needs its own length limit
+    # (a rendition at another frame rate would be cut short by a frame count)
+    main_output = [*main_maps, *encode_args, partial] if main else []
+    run_ffmpeg([
+        "ffmpeg", "-y",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{WIDTH}x{HEIGHT}", "-r", str(FPS),
+        "-i", "-",
+        *filters,
+        *renditions.output_args(extra, partial, encoder),
+        *main_output
+    ], step=f"kenburns {os.path.basename(image_path)}", capture_stderr=True, stdin_writer=write_frames)
+    # only finished clips get the real name
+    for spec in extra:
+        os.replace(renditions.outputs([spec], partial)[0], renditions.outputs([spec], output_file)[0])
+    if main:
+        os.replace(partial, output_file)
+
+def render_clips(placements, encode_args, folder=CLIP_FOLDER, extra=(), encoder=None):
+    """Encode each unique (image, seconds) once; returns the clip path per placement.
+
+    Clips already in folder from an earlier (interrupted) run are re-used.
+    With extra rendition specs, renditions.outputs(extra, clip) sit next to
+    each clip; only the missing ones are rendered, so changing the list does
+    not re-encode the main clips.
+    """
+    os.makedirs(folder, exist_ok=True)
+    clips, todo = [], {}
+    for image_path, seconds in placements:
+        clip = os.path.join(folder, f"clip_{clip_key(image_path, seconds, encode_args)}.mp4")
+        clips.append(clip)
+        missing = [spec for spec in extra if not os.path.exists(renditions.outputs([spec], clip)[0])]
+        if not os.path.exists(clip) or missing:
+            todo[clip] = (image_path, seconds, missing)
+
+    print(f"🎞️ {len(set(clips))} unique Ken Burns clips for {len(clips)} placements, {len(todo)} to render...")
+    with ThreadPoolExecutor(max_workers=CLIP_JOBS) as pool:
+        jobs = [pool.submit(render_clip, image_path, seconds, clip, encode_args, missing, encoder)
+                for clip, (image_path, seconds, missing) in todo.items()]
+        for job in jobs:
+            job.result()
+    return clips
+
+def write_list(list_file, clips):
+    with open(list_file, "w") as f:
+        for clip in clips:
+            f.write(f"file '{os.path.abspath(clip)}'\n")
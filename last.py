@@ -1,8 +1,17 @@
 import os
+import shutil
 import subprocess
+import tempfile
 import random
 import math
-from tqdm import tqdm
+import autotune
+import audio_bed
+import loudness
+import chunked_render
+import segmented
+import kenburns
+import renditions
+from ffmpeg_runner import run_ffmpeg
 
 # CONFIGURATION
 IMAGE_FOLDER = "clear_scenes"
@@ -10,6 +19,35 @@ OUTPUT_VIDEO = "last.mp4"
 BACKGROUND_MUSIC = "voice.mp3"
 IMAGE_DURATION = 10  # Each image duration = 10 seconds (reduced from 20)
 TOTAL_DURATION = 5360  # Total video duration in seconds (e.g. 2 hours 10 sec)
+ENCODER = {"preset": "faster", "crf": 23, "threads": 0}  # used when ENCODE_BUDGET is None
+ENCODE_BUDGET = None  # wall-clock seconds for the encode; set it to let autotune pick preset/CRF/threads
+OUTPUT_MODE = "mp4"  # "mp4", "fmp4" or "hls" (see segmented.py) - usable while still rendering
+RESUMABLE = False  # render in checkpointed chunks (see chunked_render.py); rerun to resume after a crash
+NORMALIZE_LOUDNESS = True  # music at loudness.TARGET_LUFS instead of its native level
+ZOOMPAN_FRAMES = 300  # zoompan output frames per image (at 25 fps: 12 s per image, kenburns clips match it)
+ZOOM_ENGINE = None  # "kenburns" (precomputed clips, see kenburns.py), "zoompan" (old filter) or None:
+                    # kenburns for mp4, zoompan for fmp4 / hls (its segments play while it renders)
+RENDITIONS = []  # extra outputs from the same render, e.g. ["480p:crf=28"] -> last_480p_crf28.mp4 (see renditions.py)
+
+def music_gain():
+    """dB to bring the music to loudness.TARGET_LUFS (measured once per file, cached)."""
+    return loudness.gain_db(loudness.measure(BACKGROUND_MUSIC)) if NORMALIZE_LOUDNESS else 0.0
+
+def zoom_engine():
+    return ZOOM_ENGINE or ("kenburns" if OUTPUT_MODE == "mp4" else "zoompan")
+
+def image_seconds():
+    """Screen time of one image: zoompan's ZOOMPAN_FRAMES at 25 fps, for either engine."""
+    return ZOOMPAN_FRAMES / 25
+
+def get_video_duration(filename):
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        filename
+    ], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
 
 def check_requirements():
     if not os.path.exists(IMAGE_FOLDER) or not os.path.isdir(IMAGE_FOLDER):
@@ -28,7 +66,7 @@ def create_slideshow():
     final_images = []
 
     print(f"🧮 Generating {images_needed} images with random repetition...\n")
-    for _ in tqdm(range(images_needed), desc="📸 Selecting images"):
+    for _ in range(images_needed):
         final_images.append(random.choice(images))
 
     # Create images.txt file for FFmpeg
@@ -38,35 +76,138 @@ def create_slideshow():
             f.write(f"duration {IMAGE_DURATION}\n")
         f.write(f"file '{os.path.join(IMAGE_FOLDER, final_images[-1])}'\n")  # last image, no duration
 
-    print("🎞️ Creating slideshow video with zoom effect...")
+    inputs = ["-f", "concat", "-safe", "0", "-i", "images.txt"]
+    filters = ["-vf", f"scale=1280:720,zoompan=z='zoom+0.0005':d={ZOOMPAN_FRAMES}:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)',fps=30"]  # Reduced zoom speed (d)
+    encoder = ENCODER
+    if zoom_engine() == "kenburns":
+        if ENCODE_BUDGET:
+            encoder = tune_kenburns(final_images)
+        render_kenburns(final_images, encoder)
+        return
+
+    if ENCODE_BUDGET:
+        encoder = autotune.tune(inputs, filters, TOTAL_DURATION, ENCODE_BUDGET, "slideshow-zoompan-720p")
+
+    if RESUMABLE and OUTPUT_MODE != "mp4":
+        raise Exception("❌ RESUMABLE only works with OUTPUT_MODE = \"mp4\".")
+    if RESUMABLE and RENDITIONS:
+        raise Exception("❌ RENDITIONS with RESUMABLE needs ZOOM_ENGINE = \"kenburns\".")
 
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-f", "concat", "-safe", "0", "-i", "images.txt",
-        "-vf", "scale=1280:720,zoompan=z='zoom+0.0005':d=300:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)',fps=30", # Reduced zoom speed (d)
-        "-c:v", "libx264", "-preset", "faster", "-pix_fmt", "yuv420p", # Added faster preset
-        "temp_video.mp4"
-    ], check=True)
+    if OUTPUT_MODE != "mp4":
+        # Video aur music ek hi pass mein, taaki pehle segments turant chal sakein
+        print(f"🎞️ Creating slideshow with zoom effect and music ({OUTPUT_MODE} output)...")
+        # Each image is one input frame that zoompan turns into ZOOMPAN_FRAMES at 25 fps,
+        # so the video (not TOTAL_DURATION) sets the length; the bed must cover all of it
+        audio_bed.build(BACKGROUND_MUSIC, len(final_images) * image_seconds(), "music_bed.aac", music_gain())
+        music = ["-map", "1:a"]
+        split_filters, main_maps = renditions.fan_out(filters, RENDITIONS, audio_maps=music)
+        run_ffmpeg([
+            "ffmpeg", "-y",
+            *inputs,
+            *audio_bed.input_args("music_bed.aac"),  # pre-encoded looping music
+            *split_filters,
+            *renditions.output_args(RENDITIONS, OUTPUT_VIDEO, encoder, music, ["-shortest", "-c:a", "copy"]),
+            *(main_maps or ["-map", "0:v", *music]),
+            "-shortest",  # cut audio to match video
+            "-c:v", "libx264", *autotune.encoder_args(encoder), "-pix_fmt", "yuv420p",
+            *segmented.keyframe_args(),
+            "-c:a", "copy",
+            *segmented.output_args(OUTPUT_VIDEO, OUTPUT_MODE)
+        ], check=True)
+        segmented.finalize(OUTPUT_VIDEO, OUTPUT_MODE)
+        print(f"✅ Final video created with background music: {OUTPUT_VIDEO}")
+        return
+
+    if RESUMABLE:
+        print("🎞️ Creating slideshow video with zoom effect (resumable chunks)...")
+        chunked_render.render(
+            lambda: [[os.path.join(IMAGE_FOLDER, img), IMAGE_DURATION] for img in final_images],
+            "temp_video.mp4",
+            [*filters, "-c:v", "libx264", *autotune.encoder_args(encoder), "-pix_fmt", "yuv420p"],
+            folder=chunked_render.chunk_dir(OUTPUT_VIDEO),  # next to the output, survives restarts
+            entry_seconds=lambda seconds: image_seconds()  # zoompan sets the length, not the image duration
+        )
+    else:
+        print("🎞️ Creating slideshow video with zoom effect...")
+
+        split_filters, main_maps = renditions.fan_out(filters, RENDITIONS)
+        run_ffmpeg([
+            "ffmpeg", "-y",
+            *inputs,
+            *split_filters,
+            *renditions.output_args(RENDITIONS, "temp_video.mp4", encoder),
+            *main_maps,
+            "-c:v", "libx264", *autotune.encoder_args(encoder), "-pix_fmt", "yuv420p",
+            "temp_video.mp4"
+        ], check=True)
 
     print("✅ Slideshow video created: temp_video.mp4")
     print("🎵 Adding background music (looped and trimmed)...")
 
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-stream_loop", "-1", "-i", BACKGROUND_MUSIC,  # loop music if needed
-        "-i", "temp_video.mp4",
-        "-shortest",  # cut audio to match video
-        "-c:v", "copy",
-        "-c:a", "aac", "-b:a", "192k",
-        "-ar", "48000", "-ac", "2",
-        OUTPUT_VIDEO
-    ], check=True)
+    # Music loop is encoded once and cached, here it is only copied; long enough for the whole video
+    audio_bed.build(BACKGROUND_MUSIC, get_video_duration("temp_video.mp4"), "music_bed.aac", music_gain())
+    outputs = [("temp_video.mp4", OUTPUT_VIDEO)] + list(zip(
+        renditions.outputs(RENDITIONS, "temp_video.mp4"), renditions.outputs(RENDITIONS, OUTPUT_VIDEO)))
+    for video, output in outputs:
+        run_ffmpeg([
+            "ffmpeg", "-y",
+            *audio_bed.input_args("music_bed.aac"),
+            "-i", video,
+            "-map", "1:v", "-map", "0:a",
+            "-shortest",  # cut audio to match video
+            "-c", "copy",
+            output
+        ], check=True)
+        print(f"✅ Final video created with background music: {output}")
 
-    print(f"✅ Final video created with background music: {OUTPUT_VIDEO}")
+        # Cleanup
+        if os.path.exists(video):
+            os.remove(video)
 
-    # Cleanup
-    if os.path.exists("temp_video.mp4"):
-        os.remove("temp_video.mp4")
+def tune_kenburns(final_images):
+    """Autotune on a lossless Ken Burns sample, for the seconds of clips that really get encoded."""
+    unique = sorted(set(final_images))
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = os.path.join(tmp, "sample.mp4")
+        kenburns.render_clip(os.path.join(IMAGE_FOLDER, unique[0]), image_seconds(), sample,
+                             ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0"])
+        return autotune.tune(["-i", sample], [], len(unique) * image_seconds(), ENCODE_BUDGET,
+                             "slideshow-kenburns-720p", sample_duration=image_seconds())
+
+def render_kenburns(final_images, encoder):
+    """Slideshow from per-image Ken Burns clips, joined with the music by stream copy."""
+    placements = [(os.path.join(IMAGE_FOLDER, img), image_seconds()) for img in final_images]
+    # RESUMABLE: clips kept next to the output, a rerun only renders missing ones
+    folder = kenburns.clip_dir(OUTPUT_VIDEO) if RESUMABLE else kenburns.CLIP_FOLDER
+    keyframes = segmented.keyframe_args() if OUTPUT_MODE != "mp4" else []
+    clips = kenburns.render_clips(placements, [
+        "-c:v", "libx264", *autotune.encoder_args(encoder), "-pix_fmt", "yuv420p", *keyframes
+    ], folder, RENDITIONS, encoder)
+
+    print("🎵 Joining clips with background music (looped and trimmed)...")
+    clip_seconds = kenburns.frame_count(image_seconds()) / kenburns.FPS
+    audio_bed.build(BACKGROUND_MUSIC, len(clips) * clip_seconds, "music_bed.aac", music_gain())
+    # main output in OUTPUT_MODE, extra renditions as plain MP4s
+    joins = [(clips, segmented.output_args(OUTPUT_VIDEO, OUTPUT_MODE))]
+    for spec in RENDITIONS:
+        joins.append(([renditions.outputs([spec], clip)[0] for clip in clips],
+                      renditions.outputs([spec], OUTPUT_VIDEO)))
+    for clip_files, output in joins:
+        kenburns.write_list("clips.txt", clip_files)
+        run_ffmpeg([
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0", "-i", "clips.txt",
+            *audio_bed.input_args("music_bed.aac"),
+            "-map", "0:v", "-map", "1:a",
+            "-shortest",  # cut audio to match video
+            "-c", "copy",
+            *output
+        ], check=True)
+    segmented.finalize(OUTPUT_VIDEO, OUTPUT_MODE)
+    print(f"✅ Final video created with background music: {OUTPUT_VIDEO}")
+    for extra in renditions.outputs(RENDITIONS, OUTPUT_VIDEO):
+        print(f"✅ Rendition created: {extra}")
+    shutil.rmtree(folder)  # joined; resumable clips are only kept after a failure
 
 def main():
     try:
@@ -74,8 +215,11 @@ def main():
     except Exception as e:
         print(f"⚠️ Error: {e}")
     finally:
-        if os.path.exists("images.txt"):
-            os.remove("images.txt")
+        for f in ["images.txt", "clips.txt", "music_bed.aac"]:
+            if os.path.exists(f):
+                os.remove(f)
+        if os.path.isdir(kenburns.CLIP_FOLDER):
+            shutil.rmtree(kenburns.CLIP_FOLDER)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,19 @@
 import os
 import random
-import subprocess
+import autotune
+import chunked_render
+import segmented
+from ffmpeg_runner import run_ffmpeg
 
 IMAGES_DIR = "clear_scenes"
 OUTPUT_VIDEO = "loading1.mp4"
 DURATION_PER_IMAGE = 14  # seconds
 TOTAL_DURATION = 8100    # seconds (20 minutes)
 NUM_IMAGES = TOTAL_DURATION // DURATION_PER_IMAGE
+ENCODER = {"preset": "medium", "crf": 23, "threads": 0}  # x264 defaults
+ENCODE_BUDGET = None  # wall-clock seconds for the encode; set it to let autotune pick preset/CRF/threads
+OUTPUT_MODE = "mp4"  # "mp4", "fmp4" or "hls" (see segmented.py) - usable while still rendering
+RESUMABLE = False  # render in checkpointed chunks (see chunked_render.py); rerun to resume after a crash
 
 def generate_image_list():
     try:
@@ -21,31 +28,56 @@ def generate_image_list():
                 f.write(f"duration {DURATION_PER_IMAGE}\n")
             f.write(f"file '{os.path.join(IMAGES_DIR, selected_images[-1])}'\n")
         print("✅ Slideshow list created.")
+        return selected_images
     except FileNotFoundError as e:
         print(e)
         raise
 
-def create_video():
+def timeline(selected_images):
+    """(image, seconds) pairs; the last image fills up to TOTAL_DURATION like -t does."""
+    entries = [[os.path.join(IMAGES_DIR, img), DURATION_PER_IMAGE] for img in selected_images]
+    entries[-1][1] += TOTAL_DURATION - DURATION_PER_IMAGE * len(entries)
+    return entries
+
+def create_video(selected_images):
     try:
+        inputs = ["-f", "concat", "-safe", "0", "-i", "slideshow_list.txt"]
+        encoder = ENCODER
+        if ENCODE_BUDGET:
+            encoder = autotune.tune(inputs, [], TOTAL_DURATION, ENCODE_BUDGET, "slideshow-still")
+
+        if RESUMABLE:
+            if OUTPUT_MODE != "mp4":
+                raise Exception("❌ RESUMABLE only works with OUTPUT_MODE = \"mp4\".")
+            chunked_render.render(
+                lambda: timeline(selected_images), OUTPUT_VIDEO,
+                ["-c:v", "libx264", *autotune.encoder_args(encoder), "-pix_fmt", "yuv420p"]
+            )
+            print(f"✅ Slideshow created: {OUTPUT_VIDEO}")
+            return
+
         # FFmpeg command to create slideshow video with random images repeating
-        result = subprocess.run([
-            "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", "slideshow_list.txt",
-            "-t", str(TOTAL_DURATION), "-c:v", "libx264", "-pix_fmt", "yuv420p", OUTPUT_VIDEO
-        ], capture_output=True, text=True)
+        keyframes = segmented.keyframe_args() if OUTPUT_MODE != "mp4" else []
+        result = run_ffmpeg([
+            "ffmpeg", "-y", *inputs,
+            "-t", str(TOTAL_DURATION), "-c:v", "libx264", *autotune.encoder_args(encoder),
+            "-pix_fmt", "yuv420p", *keyframes,
+            *segmented.output_args(OUTPUT_VIDEO, OUTPUT_MODE)
+        ], check=False, capture_stderr=True)
 
         if result.returncode != 0:
             raise Exception(f"❌ FFmpeg command failed with error:\n{result.stderr}")
-        
+
+        segmented.finalize(OUTPUT_VIDEO, OUTPUT_MODE)
         print(f"✅ Slideshow created: {OUTPUT_VIDEO}")
     
     except Exception as e:
         print(f"⚠️ Error: {e}")
-        print(f"❌ FFmpeg Output: {result.stderr}")
 
 def main():
     try:
-        generate_image_list()
-        create_video()
+        selected_images = generate_image_list()
+        create_video(selected_images)
     except Exception as e:
         print(f"⚠️ Error during process: {e}")
     finally:
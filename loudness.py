@@ -0,0 +1,120 @@
+import os
+import json
+import hashlib
+import threading
+from ffmpeg_runner import run_ffmpeg
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are kept apart
+    fcntl = None
+
+# Measured loudness for audio assets, so mixes can hit a target level in a
+# single pass instead of two-pass loudnorm.
+#
+# measure() runs loudnorm's analysis once per file content (integrated
+# loudness, true peak, LRA) and caches the result in CACHE_FILE by content
+# hash; the hash itself is cached by path + size + mtime, so repeat assets
+# cost neither a decode nor a re-hash (the cache is shared by all processes under a
+# file lock and only rewritten when something changed). gain_db() turns a measurement into a
+# plain `volume=` gain, capped so the true peak stays under TRUE_PEAK.
+
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "video_to_slideshow", "loudness.json")
+TARGET_LUFS = -16.0   # music and voice level in the final mixes
+TRUE_PEAK = -1.5      # dBTP ceiling for the applied gain
+HASH_CHUNK = 1024 * 1024
+
+_thread_lock = threading.Lock()
+
+class _Lock:
+    """Cache lock across threads and processes (batch / pipeline workers share the file)."""
+    def __enter__(self):
+        _thread_lock.acquire()
+        self.file = None
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+            self.file = open(CACHE_FILE + ".lock", "w")
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.file:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+        _thread_lock.release()
+
+def load_cache():
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, "r") as f:
+            return json.load(f)
+    return {"files": {}, "measurements": {}}
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE + ".tmp", "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(CACHE_FILE + ".tmp", CACHE_FILE)
+
+def content_hash(path, cache):
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    cached = cache["files"].get(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    cache["files"][path] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+def analyze(path):
+    """One audio-only decode through loudnorm's analysis; returns its numbers."""
+    result = run_ffmpeg([
+        "ffmpeg", "-y", "-i", path,
+        "-map", "0:a:0", "-af", "loudnorm=print_format=json",
+        "-f", "null", "-"
+    ], step=f"loudness {os.path.basename(path)}", capture_stderr=True)
+    text = result.stderr
+    stats = json.loads(text[text.rindex("{"):text.rindex("}") + 1])
+    values = {}
+    for key in ("input_i", "input_tp", "input_lra", "input_thresh"):
+        try:
+            values[key] = float(stats[key])
+        except (KeyError, ValueError):
+            values[key] = None  # silence reports -inf
+    return values
+
+def measure(path):
+    """Cached loudness of an audio (or video) file's first audio stream."""
+    with _Lock():
+        cache = load_cache()
+        known = cache["files"].get(os.path.abspath(path))
+        key = content_hash(path, cache)
+        measured = cache["measurements"].get(key)
+        if cache["files"].get(os.path.abspath(path)) != known:
+            save_cache(cache)  # only when the file had to be (re)hashed
+    if measured:
+        return measured
+
+    print(f"🔊 Measuring loudness of {path} (cached for next time)...")
+    measured = analyze(path)
+    with _Lock():
+        cache = load_cache()
+        cache["measurements"][key] = measured
+        save_cache(cache)
+    return measured
+
+def gain_db(measured, target=TARGET_LUFS):
+    """Gain that brings `measured` to `target` LUFS without pushing peaks over TRUE_PEAK."""
+    if measured.get("input_i") is None or measured["input_i"] < -70:
+        return 0.0  # silent or unmeasurable: leave it alone
+    gain = target - measured["input_i"]
+    if measured.get("input_tp") is not None:
+        gain = min(gain, TRUE_PEAK - measured["input_tp"])
+    return round(gain, 2)
+
+def volume_filter(path, target=TARGET_LUFS):
+    """`volume=XdB` for path at target loudness (measured once, then cached)."""
+    return f"volume={gain_db(measure(path), target):.2f}dB"
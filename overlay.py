@@ -1,5 +1,8 @@
 import os
 import subprocess
+import autotune
+import renditions
+from ffmpeg_runner import run_ffmpeg
 
 # Configuration
 IMAGES_DIR = "all"
@@ -8,6 +11,9 @@ OVERLAY_VIDEO = "complete.mp4"
 FINAL_VIDEO = "overlay.mp4"
 DURATION_PER_IMAGE = 15
 NUM_IMAGES =66
+ENCODER = {"preset": "fast", "crf": 23, "threads": 0}  # threads set by governor.py
+ENCODE_BUDGET = None  # wall-clock seconds per encode; set it to let autotune pick preset/CRF/threads
+RENDITIONS = []  # extra outputs of the final video from one compositing pass, e.g. ["480p:bitrate=1M"] (see renditions.py)
 
 def generate_image_list():
     all_images = sorted(os.listdir(IMAGES_DIR))
@@ -24,16 +30,20 @@ def generate_image_list():
     print("✅ Slideshow list created.")
 
 def create_video():
+    inputs = ["-f", "concat", "-safe", "0", "-i", "slideshow_list.txt"]
+    filters = ["-vf", "scale=1280:720,fps=25"]
+    encoder = ENCODER
+    if ENCODE_BUDGET:
+        encoder = autotune.tune(inputs, filters, NUM_IMAGES * DURATION_PER_IMAGE, ENCODE_BUDGET, "slideshow-720p")
+
     print("🎞️ Creating slideshow video...")
-    subprocess.run([
+    run_ffmpeg([
         "ffmpeg", "-y",
-        "-f", "concat", "-safe", "0", "-i", "slideshow_list.txt",
-        "-vf", "scale=1280:720,fps=25",
+        *inputs,
+        *filters,
         "-pix_fmt", "yuv420p",
         "-c:v", "libx264",
-        "-preset", "fast",  # Changed from medium to fast
-        "-crf", "23",
-        "-threads", "2",  # Limit threads to reduce memory
+        *autotune.encoder_args(encoder),
         OUTPUT_VIDEO
     ], check=True)
     print(f"✅ Slideshow created: {OUTPUT_VIDEO}")
@@ -57,22 +67,30 @@ def overlay_green_screen():
         f"[0:v][overlay]overlay=shortest=1"
     )
     
-    subprocess.run([
+    inputs = ["-i", OUTPUT_VIDEO, "-stream_loop", "-1", "-i", OVERLAY_VIDEO]
+    filters = ["-filter_complex", filter_complex]
+    encoder = ENCODER
+    if ENCODE_BUDGET:
+        encoder = autotune.tune(inputs, filters, promo_duration, ENCODE_BUDGET, "overlay-colorkey-720p")
+
+    shared = ["-t", str(promo_duration), "-movflags", "+faststart"]
+    # overlay video ka audio (agar hai) explicit map karna padta hai jab outputs label se map hote hain
+    filters, main_maps = renditions.fan_out(filters, RENDITIONS, default_fps=25, audio_maps=["-map", "1:a?"])
+    run_ffmpeg([
         "ffmpeg", "-y",
-        "-i", OUTPUT_VIDEO,
-        "-stream_loop", "-1",
-        "-i", OVERLAY_VIDEO,
-        "-filter_complex", filter_complex,
+        *inputs,
+        *filters,
+        *renditions.output_args(RENDITIONS, FINAL_VIDEO, encoder, ["-map", "1:a?"], shared),
+        *main_maps,
         "-c:v", "libx264",
-        "-preset", "fast",  # Changed from medium to fast
-        "-crf", "23",
+        *autotune.encoder_args(encoder),
         "-pix_fmt", "yuv420p",
-        "-threads", "2",  # Limit threads to reduce memory
-        "-t", str(promo_duration),
-        "-movflags", "+faststart",
+        *shared,
         FINAL_VIDEO
     ], check=True)
     print(f"✅ Final video created: {FINAL_VIDEO}")
+    for extra in renditions.outputs(RENDITIONS, FINAL_VIDEO):
+        print(f"✅ Rendition created: {extra}")
 
 def main():
     try:
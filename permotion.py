@@ -1,10 +1,12 @@
 import os
-import subprocess
+import renditions
+from ffmpeg_runner import run_ffmpeg
 
 IMAGES_DIR = "all1"  # Folder containing the images
 OUTPUT_VIDEO = "promotion1.mp4"  # Output video name
 DURATION_PER_IMAGE = 5  # Duration per image in seconds
 NUM_IMAGES =17  # Total number of images (as you mentioned) 
+RENDITIONS = []  # extra outputs from the same pass, e.g. ["720p"] -> promotion1_720p.mp4 (see renditions.py)
 
 def generate_image_list():
     all_images = sorted(os.listdir(IMAGES_DIR))
@@ -25,9 +27,13 @@ def generate_image_list():
 
 def create_video():
     print("🎞️ Generating slideshow video...")
-    subprocess.run([
+    filters, main_maps = renditions.fan_out(["-vf", "scale=1920:1080,setsar=1:1"], RENDITIONS)  # Full HD resolution
+    run_ffmpeg([
         "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", "slideshow_list.txt",
-        "-vf", "scale=1920:1080,setsar=1:1",  # Full HD resolution
+        *filters,
+        # extras use ffmpeg's own x264 defaults, like the main output
+        *renditions.output_args(RENDITIONS, OUTPUT_VIDEO, {"preset": "medium", "crf": 23}, shared_args=["-vsync", "vfr"]),
+        *main_maps,
         "-vsync", "vfr", "-pix_fmt", "yuv420p", OUTPUT_VIDEO
     ], check=True)
     print(f"✅ Slideshow created: {OUTPUT_VIDEO}")
@@ -0,0 +1,416 @@
+import os
+import sys
+import ast
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Runs the scripts as one dependency graph:
+#   extract -> slideshow ------------------\
+#   trailer ----\                           final -> cut
+#   promotion ---> start ------------------/
+# Har stage apne declared inputs, outputs aur params ke saath. Agar inputs ka
+# content, params aur script same hain to stage skip ho jata hai.
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = ".pipeline"
+STATE_FILE = os.path.join(STATE_DIR, "state.json")
+WORK_DIR = os.path.join(STATE_DIR, "work")
+MAX_PARALLEL = 2
+HASH_CHUNK = 1024 * 1024
+VERIFY_OUTPUTS = True  # packet-level check of every media output (verify.py); only fatal problems fail a stage
+MEDIA_EXTENSIONS = (".mp4", ".mov", ".mkv", ".m4v")
+
+# inputs / outputs map the script's constant name to a path (or list of paths).
+# params are plain constants overridden in the script before main() runs.
+# derive recomputes constants that the script calculates from other params.
+STAGES = [
+    {
+        "name": "extract",
+        "script": "extract_clear_images.py",
+        "inputs": {"INPUT_VIDEO": "input.mp4"},
+        "outputs": {"CLEAR_FRAMES_DIR": "clear_scenes"},
+        "params": {},
+    },
+    {
+        "name": "slideshow",
+        "script": "last.py",
+        "inputs": {"IMAGE_FOLDER": "clear_scenes", "BACKGROUND_MUSIC": "voice.mp3"},
+        "outputs": {"OUTPUT_VIDEO": "last.mp4"},
+        "params": {"IMAGE_DURATION": 10, "TOTAL_DURATION": 5360},
+    },
+    {
+        "name": "trailer",
+        "script": "trailer.py",
+        "inputs": {"INPUT_VIDEO": "input.mp4", "BACKGROUND_MUSIC": "music.mp3"},
+        "outputs": {"OUTPUT_VIDEO": "trailer.mp4"},
+        "params": {"DURATION_PER_CLIP": 3, "TOTAL_DURATION": 35, "MUSIC_START_TIME": 8},
+        "derive": lambda p: {"NUM_CLIPS": p["TOTAL_DURATION"] // p["DURATION_PER_CLIP"]},
+    },
+    {
+        "name": "promotion",
+        "script": "overlay.py",
+        "inputs": {"IMAGES_DIR": "all", "OVERLAY_VIDEO": "complete.mp4"},
+        "outputs": {"OUTPUT_VIDEO": "promotion.mp4", "FINAL_VIDEO": "overlay.mp4"},
+        "params": {"DURATION_PER_IMAGE": 15, "NUM_IMAGES": 66},
+    },
+    {
+        "name": "start",
+        "script": "start.py",
+        "inputs": {"VIDEOS": ["trailer.mp4", "promotion.mp4"]},
+        "outputs": {"FINAL_OUTPUT": "start.mp4"},
+        "params": {},
+    },
+    {
+        "name": "final",
+        "script": "final.py",
+        "inputs": {"VIDEOS_TO_MERGE": ["start.mp4", "last.mp4"]},
+        "outputs": {"FINAL_VIDEO": "final_output.mp4"},
+        "params": {},
+    },
+    {
+        "name": "cut",
+        "script": "cut.py",
+        "inputs": {"input_file": "final_output.mp4"},
+        "outputs": {"output_file": "output_cut.mp4"},
+        "params": {"cut_start": None, "cut_end": "02:10:36", "SMART_CUT": True},
+    },
+]
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+def stage_paths(stage, key):
+    paths = []
+    for value in stage[key].values():
+        paths.extend(as_list(value))
+    return paths
+
+def build_graph(stages):
+    """Map each stage to the stages that produce its inputs."""
+    producers = {}
+    for stage in stages:
+        for path in stage_paths(stage, "outputs"):
+            if path in producers:
+                raise Exception(f"❌ {path} is produced by both {producers[path]} and {stage['name']}.")
+            producers[path] = stage["name"]
+
+    deps = {}
+    for stage in stages:
+        deps[stage["name"]] = sorted({producers[p] for p in stage_paths(stage, "inputs")
+                                      if p in producers and producers[p] != stage["name"]})
+
+    # Cycle check (Kahn) so a bad edit fails here instead of hanging the scheduler
+    remaining = {name: set(d) for name, d in deps.items()}
+    while remaining:
+        ready = [name for name, d in remaining.items() if not d]
+        if not ready:
+            raise Exception(f"❌ Dependency cycle between stages: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return deps
+
+def load_state(root):
+    path = os.path.join(root, STATE_FILE)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {"hashes": {}, "stages": {}}
+
+def save_state(root, state):
+    path = os.path.join(root, STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def file_hash(path, cache):
+    """Content hash of one file, cached by (size, mtime) so big videos are hashed once."""
+    st = os.stat(path)
+    cached = cache.get(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    cache[path] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+    return cache[path][2]
+
+def content_hash(path, cache):
+    """Hash a file or a whole folder (names + contents). None if missing."""
+    if not os.path.exists(path):
+        return None
+    if os.path.isfile(path):
+        return file_hash(path, cache)
+
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for name in sorted(filenames):
+            full = os.path.join(dirpath, name)
+            digest.update(os.path.relpath(full, path).encode())
+            digest.update(file_hash(full, cache).encode())
+    return digest.hexdigest()
+
+def stage_overrides(stage, root):
+    """Constants to set in the script: absolute input/output paths plus params."""
+    overrides = {}
+    for key in ("inputs", "outputs"):
+        for name, value in stage[key].items():
+            if isinstance(value, list):
+                overrides[name] = [os.path.join(root, v) for v in value]
+            else:
+                overrides[name] = os.path.join(root, value)
+    overrides.update(stage["params"])
+    if stage.get("derive"):
+        overrides.update(stage["derive"](stage["params"]))
+    return overrides
+
+def local_modules(script):
+    """The script plus every repo module it imports, directly or through another one."""
+    found, todo = [], [script]
+    while todo:
+        name = todo.pop()
+        if name in found:
+            continue
+        found.append(name)
+        with open(os.path.join(SCRIPT_DIR, name), "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):  # imports inside functions count too (kenburns, planner...)
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            todo += [n + ".py" for n in names if os.path.exists(os.path.join(SCRIPT_DIR, n + ".py"))]
+    return sorted(found)
+
+def fingerprint(stage, root, cache):
+    digest = hashlib.sha256()
+    # a change in a shared module (kenburns.py, loudness.py...) re-runs the stage too
+    for module in local_modules(stage["script"]):
+        digest.update(module.encode())
+        with open(os.path.join(SCRIPT_DIR, module), "rb") as f:
+            digest.update(f.read())
+    digest.update(json.dumps(stage["params"], sort_keys=True).encode())
+    for path in stage_paths(stage, "inputs"):
+        digest.update(path.encode())
+        digest.update(str(content_hash(os.path.join(root, path), cache)).encode())
+    return digest.hexdigest()
+
+def run_stage(stage, root, scratch):
+    """Run one script in its own scratch folder so temp files never clash."""
+    work = os.path.join(scratch, stage["name"])
+    if os.path.exists(work):
+        shutil.rmtree(work)
+    os.makedirs(work)
+
+    outputs = [os.path.join(root, p) for p in stage_paths(stage, "outputs")]
+    before = {p: os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in outputs}
+
+    spec = {"script": os.path.join(SCRIPT_DIR, stage["script"]), "overrides": stage_overrides(stage, root)}
+    os.makedirs(os.path.join(root, STATE_DIR), exist_ok=True)
+    log_path = os.path.join(root, STATE_DIR, f"{stage['name']}.log")
+    # ffmpeg metrics go next to the state file, tagged with the stage name
+    env = dict(os.environ, FFMPEG_STAGE=stage["name"],
+               FFMPEG_METRICS=os.environ.get("FFMPEG_METRICS", os.path.join(root, STATE_DIR, "metrics.jsonl")))
+    try:
+        with open(log_path, "w") as log:
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-script", json.dumps(spec)],
+                cwd=work, stdout=log, stderr=subprocess.STDOUT, env=env
+            )
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    # Scripts print their errors instead of raising, so also check that every
+    # declared output was actually (re)written.
+    stale = [p for p in outputs if not os.path.exists(p) or os.stat(p).st_mtime_ns == before[p]]
+    if result.returncode != 0 or stale:
+        raise Exception(f"stage '{stage['name']}' failed (see {log_path})")
+
+    # Exit code 0 does not mean the timestamps are sane: scan every media output
+    if VERIFY_OUTPUTS:
+        import verify
+        for path in outputs:
+            if not path.lower().endswith(MEDIA_EXTENSIONS):
+                continue
+            result = verify.analyze(path)
+            found = verify.problems(result)
+            if not found:
+                continue
+            with open(log_path, "a") as log:
+                log.write(f"\nverify {path}:\n" + "".join(f"  {p}\n" for p in found))
+            broken = verify.fatal(result)
+            if broken:
+                raise Exception(f"stage '{stage['name']}' output {os.path.basename(path)} failed verification: "
+                                f"{broken[0]}" + (f" (+{len(broken) - 1} more, see {log_path})" if len(broken) > 1 else ""))
+            # gaps / A/V offsets: known for some stages (e.g. trailerflip drift), so only reported
+            print(f"⚠️ {stage['name']}: {os.path.basename(path)}: {found[0]}"
+                  + (f" (+{len(found) - 1} more, see {log_path})" if len(found) > 1 else ""))
+
+def run_script(script, overrides):
+    """Child side: import the script, apply overrides, call its main()."""
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(script))[0], script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for name, value in overrides.items():
+        setattr(module, name, value)
+    module.main()
+
+def select_stages(stages, deps, only=None):
+    """--only: just these stages and whatever they depend on (default: all)."""
+    by_name = {s["name"]: s for s in stages}
+    if not only:
+        return set(by_name)
+    wanted = set()
+    pending = list(only)
+    while pending:
+        name = pending.pop()
+        if name not in by_name:
+            raise Exception(f"❌ Unknown stage: {name}")
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(deps[name])
+    return wanted
+
+def run_pipeline(stages=STAGES, root=".", jobs=MAX_PARALLEL, force=(), only=None, scratch=None):
+    root = os.path.abspath(root)
+    scratch = os.path.abspath(scratch) if scratch else os.path.join(root, WORK_DIR)
+    deps = build_graph(stages)
+    by_name = {s["name"]: s for s in stages}
+    wanted = select_stages(stages, deps, only)
+
+    state = load_state(root)
+    cache = state["hashes"]
+    done, failed, running = set(), set(), {}
+    results = {}
+
+    print(f"🧩 Pipeline: {len(wanted)} stages, up to {jobs} in parallel\n")
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(done) + len(failed) < len(wanted):
+            progressed = False
+            for name in sorted(wanted - done - failed - set(running.values())):
+                if any(d in failed for d in deps[name]):
+                    print(f"⏭️ {name}: skipped, dependency failed")
+                    failed.add(name)
+                    progressed = True
+                    continue
+                if not all(d in done for d in deps[name]):
+                    continue
+
+                stage = by_name[name]
+                fp = fingerprint(stage, root, cache)
+                outputs_ok = all(os.path.exists(os.path.join(root, p)) for p in stage_paths(stage, "outputs"))
+                if name not in force and outputs_ok and state["stages"].get(name) == fp:
+                    print(f"✅ {name}: up to date")
+                    results[name] = "cached"
+                    done.add(name)
+                    progressed = True
+                    continue
+
+                print(f"▶️ {name}: running {stage['script']}")
+                future = pool.submit(run_stage, stage, root, scratch)
+                future.started = time.time()
+                future.fingerprint = fp
+                running[future] = name
+
+            if not running:
+                if progressed:
+                    continue  # cached / skipped stages may have unblocked others
+                # Nothing running and nothing ready: the rest can never start
+                for name in sorted(wanted - done - failed):
+                    waiting = [d for d in deps[name] if d not in done]
+                    print(f"⛔ {name}: blocked, waiting on {', '.join(waiting)}")
+                    results[name] = "failed"
+                    failed.add(name)
+                break
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                elapsed = time.time() - future.started
+                try:
+                    future.result()
+                    state["stages"][name] = future.fingerprint
+                    results[name] = "built"
+                    done.add(name)
+                    print(f"✅ {name}: done in {elapsed:.1f}s")
+                except Exception as e:
+                    state["stages"].pop(name, None)
+                    results[name] = "failed"
+                    failed.add(name)
+                    print(f"❌ {name}: {e}")
+                save_state(root, state)
+
+    save_state(root, state)
+
+    # Teach the dry-run planner how fast this machine really is
+    import planner
+    try:
+        planner.update_calibration(os.environ.get("FFMPEG_METRICS", os.path.join(root, STATE_DIR, "metrics.jsonl")), stages)
+    except Exception as e:  # the run itself is done; a bad metrics file must not fail it
+        print(f"⚠️ Planner calibration not updated: {e}")
+    return results
+
+def parse_set(values, stages):
+    """--set slideshow.TOTAL_DURATION=2200 -> update that stage's params."""
+    by_name = {s["name"]: s for s in stages}
+    for item in values:
+        key, _, raw = item.partition("=")
+        name, _, param = key.partition(".")
+        if name not in by_name or not param or not _:
+            raise Exception(f"❌ Bad --set value: {item} (expected stage.PARAM=value)")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        by_name[name]["params"][param] = value
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the video pipeline, skipping unchanged stages.")
+    parser.add_argument("--jobs", type=int, default=MAX_PARALLEL, help="stages to run in parallel")
+    parser.add_argument("--force", action="append", default=[], help="rebuild this stage even if unchanged")
+    parser.add_argument("--only", action="append", help="run only this stage (and its dependencies)")
+    parser.add_argument("--set", action="append", default=[], help="override a param: stage.PARAM=value")
+    parser.add_argument("--scratch", help="folder for temp files (default: .pipeline/work)")
+    parser.add_argument("--dry-run", action="store_true", help="show the plan with time and disk estimates, run nothing")
+    return parser
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--run-script":
+        spec = json.loads(sys.argv[2])
+        run_script(spec["script"], spec["overrides"])
+        return
+
+    args = build_parser().parse_args()
+    if args.dry_run:
+        import planner
+        parse_set(args.set, STAGES)
+        planner.show_plan(planner.plan_pipeline(STAGES, jobs=args.jobs, force=set(args.force), only=args.only))
+        return
+
+    try:
+        parse_set(args.set, STAGES)
+        results = run_pipeline(STAGES, jobs=args.jobs, force=set(args.force), only=args.only,
+                               scratch=args.scratch)
+    except Exception as e:
+        print(f"⚠️ Error: {e}")
+        sys.exit(1)
+
+    if "failed" in results.values():
+        sys.exit(1)
+    print("\n🎉 Pipeline finished.")
+
+if __name__ == "__main__":
+    main()
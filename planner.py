@@ -0,0 +1,405 @@
+import os
+import ast
+import json
+import math
+import tempfile
+import statistics
+import subprocess
+import pipeline
+import autotune
+import renditions
+
+try:
+    import fcntl
+except ImportError:  # Windows: no shared lock
+    fcntl = None
+
+# Dry-run planner for pipeline.py: which stages would run, how many ffmpeg
+# calls and frames each needs, and estimated wall time, CPU time and peak
+# extra disk use - without running anything.
+#
+#   python pipeline.py --dry-run [--jobs N] [--only STAGE] [--set stage.PARAM=value]
+#   python vts.py plan -- --set slideshow.TOTAL_DURATION=5360
+#
+# Work per stage comes from a small model of each script (MODELS). Time comes
+# from per-machine calibration in CACHE_FILE, which every pipeline run updates
+# from its ffmpeg metrics (seconds per encoded frame, seconds per short call).
+# Scripts never run on this machine fall back to autotune's measured encoder
+# speed, then to DEFAULT_RATES.
+
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "video_to_slideshow", "planner.json")
+DEFAULT_RATES = {"s_per_frame": 1 / 60, "cpu_per_frame": 4 / 60, "s_per_call": 0.5, "cpu_per_call": 0.5}
+RATE_MIN_FRAMES = 100         # calls with fewer frames count as per-call overhead
+DECODE_FPS = 400              # decode-only passes (scene detection), frames per second
+DECODE_CPUS = 2
+SOURCE_FPS = 25               # assumed frame rate of input.mp4
+SECONDS_PER_SCENE = 6         # typical scene length when no TARGET_SCENES is set
+VIDEO_BYTES_PER_S = 2_500_000 / 8
+HD_VIDEO_BYTES_PER_S = 5_000_000 / 8
+AUDIO_BYTES_PER_S = 192_000 / 8
+JPEG_BYTES = 200 * 1024
+
+# autotune content type per script (see the autotune.tune calls)
+CONTENT_TYPES = {
+    "last.py": "slideshow-zoompan-720p",
+    "overlay.py": "overlay-colorkey-720p",
+    "start.py": "hd-1080p",
+    "final.py": "normalize-30fps",
+}
+
+def script_constants(script):
+    """Module-level literal constants of a script, read with ast (nothing imported)."""
+    with open(os.path.join(pipeline.SCRIPT_DIR, script), "r") as f:
+        tree = ast.parse(f.read())
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+    return constants
+
+def probe_duration(path):
+    if not os.path.isfile(path):
+        return None
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", path
+    ], capture_output=True, text=True)
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+def seconds(value):
+    """HH:MM:SS (or plain seconds) -> seconds, None stays None."""
+    if value is None:
+        return None
+    total = 0.0
+    for part in str(value).split(":"):
+        total = total * 60 + float(part)
+    return total
+
+# Work models: script constants + duration(path) -> calls, frames, disk
+
+def model_extract(c, duration):
+    length = duration(c["INPUT_VIDEO"]) or 0
+    decode = length * SOURCE_FPS
+    if c.get("TOP_FRAMES"):
+        picks = c["TOP_FRAMES"]
+        return {"calls": 1 + picks, "frames": picks, "decode_frames": decode,
+                "scratch_bytes": 0, "output_bytes": picks * JPEG_BYTES, "media_s": 0}
+
+    scenes = c.get("TARGET_SCENES") or math.ceil(length / SECONDS_PER_SCENE)
+    width = c.get("FRAME_WIDTH", 1280)
+    if c.get("SCENE_ENGINE") == "numpy":
+        calls, frames, scratch = 1 + scenes, scenes, 0
+    elif c.get("USE_FRAME_STORE"):
+        calls, frames, scratch = 1 + scenes, scenes * 10, scenes * 10 * width * (width * 9 // 16) * 3
+    else:
+        calls, frames, scratch = 1 + scenes * 10, scenes * 10, scenes * 10 * JPEG_BYTES
+    return {"calls": calls, "frames": frames, "decode_frames": decode,
+            "scratch_bytes": scratch, "output_bytes": scenes * JPEG_BYTES, "media_s": 0}
+
+def zoom_engine(c):
+    """last.py's engine: ZOOM_ENGINE, else kenburns for mp4 and zoompan for segmented output."""
+    return c.get("ZOOM_ENGINE") or ("kenburns" if c.get("OUTPUT_MODE", "mp4") == "mp4" else "zoompan")
+
+def model_slideshow(c, duration):
+    # every image is on screen ZOOMPAN_FRAMES at 25 fps, so that sets the length
+    images = math.ceil(c["TOTAL_DURATION"] / c["IMAGE_DURATION"])
+    seconds = c.get("ZOOMPAN_FRAMES", 300) / 25
+    media = images * seconds
+    video = media * VIDEO_BYTES_PER_S
+    if zoom_engine(c) == "kenburns":
+        # one clip per unique image (at most the folder's images), then a copy join
+        clips = images
+        folder = c.get("IMAGE_FOLDER")
+        if folder and os.path.isdir(folder):
+            clips = min(clips, len(os.listdir(folder))) or clips
+        return {"calls": clips + 2, "frames": clips * seconds * 30, "decode_frames": 0,
+                "scratch_bytes": clips * seconds * VIDEO_BYTES_PER_S,
+                "output_bytes": video + media * AUDIO_BYTES_PER_S, "media_s": media}
+    calls = 3  # video, looping audio bed, mux
+    if c.get("RESUMABLE"):
+        calls += math.ceil(media / c.get("CHUNK_SECONDS", 300))
+    return {"calls": calls, "frames": media * 30, "decode_frames": 0,
+            "scratch_bytes": video, "output_bytes": video + media * AUDIO_BYTES_PER_S, "media_s": media}
+
+def model_trailer(c, duration):
+    media = c["TOTAL_DURATION"]
+    clips = c.get("NUM_CLIPS") or media // c["DURATION_PER_CLIP"]
+    video = media * VIDEO_BYTES_PER_S
+    calls = clips + 3 + int(c.get("NORMALIZE_LOUDNESS", True))  # + loudness pass over the joined clips
+    return {"calls": calls, "frames": clips * c["DURATION_PER_CLIP"] * SOURCE_FPS, "decode_frames": 0,
+            "scratch_bytes": 2 * video, "output_bytes": video + media * AUDIO_BYTES_PER_S, "media_s": media}
+
+def model_overlay(c, duration):
+    media = c["NUM_IMAGES"] * c["DURATION_PER_IMAGE"]
+    # slideshow encode, then the keyed overlay encode on top of it
+    return {"calls": 2, "frames": 2 * media * 25, "decode_frames": 0,
+            "scratch_bytes": 0, "output_bytes": 2 * media * VIDEO_BYTES_PER_S, "media_s": media}
+
+def model_convert_merge(fps, bytes_per_s, key):
+    """start.py / final.py: re-encode every input, then stream-copy merge."""
+    def model(c, duration):
+        videos = c[key]
+        media = sum(duration(v) or 0 for v in videos)
+        converted = media * (bytes_per_s + AUDIO_BYTES_PER_S)
+        return {"calls": len(videos) + 1, "frames": media * fps, "decode_frames": 0,
+                "scratch_bytes": converted, "output_bytes": converted, "media_s": media}
+    return model
+
+def model_cut(c, duration):
+    length = duration(c["input_file"]) or 0
+    start = seconds(c.get("cut_start")) or 0
+    end = seconds(c.get("cut_end")) or length
+    if length:
+        end = min(end, length)
+    media = max(0.0, end - start)
+    # smart cut: two short re-encoded edges plus a stream copy of the middle
+    frames = 2 * 4 * 30 if c.get("SMART_CUT") else 0
+    calls = 4 if c.get("SMART_CUT") else 1
+    output = media * (HD_VIDEO_BYTES_PER_S + AUDIO_BYTES_PER_S)
+    return {"calls": calls, "frames": frames, "decode_frames": 0,
+            "scratch_bytes": output if c.get("SMART_CUT") else 0, "output_bytes": output, "media_s": media}
+
+# main output height per script, for pricing extra RENDITIONS (see renditions.py)
+OUTPUT_HEIGHTS = {"last.py": 720, "overlay.py": 720, "start.py": 1080}
+
+def with_renditions(work, c, script):
+    """Each extra rendition adds an encode of the same frames, scaled by its pixel count."""
+    main = OUTPUT_HEIGHTS.get(script)
+    if not main or not c.get("RENDITIONS"):
+        return work
+    factor = sum((renditions.parse(spec)["height"] / main) ** 2 for spec in c["RENDITIONS"])
+    work = dict(work)
+    work["frames"] = work["frames"] * (1 + factor)
+    work["output_bytes"] = work["output_bytes"] * (1 + factor)
+    if script == "start.py":  # converted renditions wait on disk for their merge too
+        work["scratch_bytes"] = work["scratch_bytes"] * (1 + factor)
+    return work
+
+MODELS = {
+    "extract_clear_images.py": model_extract,
+    "last.py": model_slideshow,
+    "trailer.py": model_trailer,
+    "overlay.py": model_overlay,
+    "start.py": model_convert_merge(30, HD_VIDEO_BYTES_PER_S, "VIDEOS"),
+    "final.py": model_convert_merge(30, HD_VIDEO_BYTES_PER_S, "VIDEOS_TO_MERGE"),
+    "cut.py": model_cut,
+}
+
+# Calibration
+
+def load_cache():
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+class _Lock:
+    """Cache lock across processes (batch.py runs pipelines in parallel workers)."""
+    def __enter__(self):
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        self.file = open(CACHE_FILE + ".lock", "w")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+def save_cache(cache):
+    """Atomic write through a temp file of this process's own (call it under _Lock)."""
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(CACHE_FILE), prefix="planner.", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, CACHE_FILE)
+
+def decode_only(cmd):
+    """Passes that decode without encoding: `-f null` output, or frames piped to Python."""
+    pairs = list(zip(cmd, cmd[1:]))
+    return ("-f", "null") in pairs or (bool(cmd) and cmd[-1] in ("-", "pipe:1"))
+
+def stream_copy(cmd):
+    """Video is copied, not encoded: frames pass through at I/O speed."""
+    pairs = list(zip(cmd, cmd[1:]))
+    return any(pair in pairs for pair in (("-c", "copy"), ("-c:v", "copy"), ("-vcodec", "copy")))
+
+def update_calibration(metrics_file, stages=pipeline.STAGES):
+    """Fold a metrics JSONL file into this machine's per-script rates."""
+    if not os.path.exists(metrics_file):
+        return
+    scripts = {s["name"]: s["script"] for s in stages}
+    calls = {}
+    with open(metrics_file, "r") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("type") != "ffmpeg" or record.get("returncode") != 0:
+                continue
+            cmd = record.get("cmd", [])
+            if decode_only(cmd):
+                continue  # decode-only passes are modelled with DECODE_FPS
+            script = scripts.get(record.get("stage"), record.get("script"))
+            calls.setdefault(script, []).append(record)
+
+    machine = autotune.machine_key()
+    with _Lock():  # re-read under the lock: parallel runs each add their own scripts
+        cache = load_cache()
+        fold_calls(cache, machine, calls)
+        save_cache(cache)
+
+def fold_calls(cache, machine, calls):
+    for script, records in calls.items():
+        # stream-copy joins / muxes report many frames in little time: per-call cost only
+        encodes = [r for r in records if not stream_copy(r.get("cmd", []))]
+        long_calls = [r for r in encodes if r.get("frame", 0) >= RATE_MIN_FRAMES]
+        short_calls = [r for r in records if r not in long_calls]
+        rates = dict(cache.get(f"{machine}|{script}", {}))
+        frames = sum(r["frame"] for r in long_calls)
+        if frames:
+            rates["s_per_frame"] = sum(r["wall_s"] for r in long_calls) / frames
+            rates["cpu_per_frame"] = sum(r.get("cpu_s", r["wall_s"]) for r in long_calls) / frames
+        if short_calls:
+            rates["s_per_call"] = statistics.median(r["wall_s"] for r in short_calls)
+            rates["cpu_per_call"] = statistics.median(r.get("cpu_s", r["wall_s"]) for r in short_calls)
+        if rates:
+            cache[f"{machine}|{script}"] = rates
+
+def rates_for(script, constants, cache, machine):
+    """Calibrated rates, else autotune's encoder speed, else defaults. Also returns the source."""
+    rates = dict(DEFAULT_RATES)
+    source = "default"
+    content_type = CONTENT_TYPES.get(script)
+    if script == "last.py" and zoom_engine(constants) == "kenburns":
+        content_type = "slideshow-kenburns-720p"
+    measured = autotune.load_cache().get(f"{machine}|{content_type}", {})
+    encoder = constants.get("ENCODER", {})
+    setting = measured.get(autotune.candidate_key(encoder)) if encoder else None
+    if setting:
+        fps = 30 if script != "overlay.py" else 25
+        rates["s_per_frame"] = 1 / (setting["speed"] * fps)
+        rates["cpu_per_frame"] = rates["s_per_frame"] * (os.cpu_count() or 1) * 0.7
+        source = "autotune"
+    calibrated = cache.get(f"{machine}|{script}")
+    if calibrated:
+        rates.update(calibrated)
+        source = "measured"
+    return rates, source
+
+# Plan
+
+def plan_pipeline(stages=pipeline.STAGES, root=".", jobs=pipeline.MAX_PARALLEL, force=(), only=None):
+    root = os.path.abspath(root)
+    deps = pipeline.build_graph(stages)
+    by_name = {s["name"]: s for s in stages}
+    wanted = pipeline.select_stages(stages, deps, only)
+    state = pipeline.load_state(root)
+    hash_cache = state["hashes"]
+    cache = load_cache()
+    machine = autotune.machine_key()
+
+    planned_durations = {}  # outputs of stages that will run: path -> seconds
+
+    def duration(path):
+        if path in planned_durations:
+            return planned_durations[path]
+        return probe_duration(path)
+
+    order = []
+    remaining = set(wanted)
+    while remaining:
+        ready = sorted(n for n in remaining if all(d not in remaining for d in deps[n]))
+        order.extend(ready)
+        remaining.difference_update(ready)
+
+    plans = {}
+    for name in order:
+        stage = by_name[name]
+        outputs_ok = all(os.path.exists(os.path.join(root, p)) for p in pipeline.stage_paths(stage, "outputs"))
+        upstream_runs = any(plans[d]["run"] for d in deps[name] if d in plans)
+        skip = (name not in force and not upstream_runs and outputs_ok
+                and state["stages"].get(name) == pipeline.fingerprint(stage, root, hash_cache))
+
+        constants = script_constants(stage["script"])
+        constants.update(pipeline.stage_overrides(stage, root))
+        work = with_renditions(MODELS[stage["script"]](constants, duration), constants, stage["script"])
+        rates, source = rates_for(stage["script"], constants, cache, machine)
+        wall = (work["frames"] * rates["s_per_frame"] + work["decode_frames"] / DECODE_FPS
+                + work["calls"] * rates["s_per_call"])
+        cpu = (work["frames"] * rates["cpu_per_frame"] + work["decode_frames"] / DECODE_FPS * DECODE_CPUS
+               + work["calls"] * rates["cpu_per_call"])
+
+        plan = dict(work, name=name, script=stage["script"], run=not skip, rates=source,
+                    wall_s=0.0 if skip else wall, cpu_s=0.0 if skip else cpu)
+        plans[name] = plan
+        if not skip:
+            for path in pipeline.stage_paths(stage, "outputs"):
+                planned_durations[os.path.join(root, path)] = work["media_s"]
+
+    # List-schedule the stages on `jobs` slots, tracking disk as they start and end
+    finish, slots, events = {}, [0.0] * max(1, jobs), []
+    for name in order:
+        plan = plans[name]
+        ready = max([finish[d] for d in deps[name] if d in finish], default=0.0)
+        if not plan["run"]:
+            finish[name] = ready
+            continue
+        slot = min(range(len(slots)), key=lambda i: slots[i])
+        start = max(slots[slot], ready)
+        finish[name] = slots[slot] = start + plan["wall_s"]
+        events.append((start, 1, plan["scratch_bytes"] + plan["output_bytes"]))
+        events.append((finish[name], 0, -plan["scratch_bytes"]))
+
+    disk = peak_disk = 0
+    for _, _, change in sorted(events):
+        disk += change
+        peak_disk = max(peak_disk, disk)
+
+    running = [plans[n] for n in order if plans[n]["run"]]
+    return {
+        "stages": [plans[n] for n in order],
+        "jobs": jobs,
+        "ffmpeg_calls": sum(p["calls"] for p in running),
+        "frames": sum(p["frames"] for p in running),
+        "wall_s": max(finish.values(), default=0.0),
+        "cpu_s": sum(p["cpu_s"] for p in running),
+        "peak_disk_bytes": peak_disk,
+    }
+
+def format_time(s):
+    s = int(round(s))
+    return f"{s // 3600}h{s % 3600 // 60:02d}m" if s >= 3600 else f"{s // 60}m{s % 60:02d}s"
+
+def show_plan(plan):
+    print(f"🗺️ Dry run: {len(plan['stages'])} stages, up to {plan['jobs']} in parallel\n")
+    for p in plan["stages"]:
+        if not p["run"]:
+            print(f"⏭️ {p['name']:<10} up to date, skipped")
+            continue
+        print(f"▶️ {p['name']:<10} {int(p['calls']):>6} ffmpeg calls  {int(p['frames']):>8} frames  "
+              f"~{format_time(p['wall_s']):>7} wall  ~{format_time(p['cpu_s']):>7} CPU  "
+              f"{(p['scratch_bytes'] + p['output_bytes']) / 1e9:6.2f} GB  ({p['rates']} rates)")
+    print(f"\n⏱️ Estimated wall time: {format_time(plan['wall_s'])}, CPU time: {format_time(plan['cpu_s'])}")
+    print(f"🎞️ {int(plan['ffmpeg_calls'])} ffmpeg calls, {int(plan['frames'])} frames to encode")
+    print(f"💾 Peak extra disk: {plan['peak_disk_bytes'] / 1e9:.2f} GB")
+
+def main():
+    parser = pipeline.build_parser()
+    parser.description = "Estimate a pipeline run (stages, ffmpeg calls, time, disk) without running it."
+    parser.add_argument("--json", action="store_true", help="print the plan as JSON")
+    args = parser.parse_args()
+    pipeline.parse_set(args.set, pipeline.STAGES)
+    plan = plan_pipeline(pipeline.STAGES, jobs=args.jobs, force=set(args.force), only=args.only)
+    if args.json:
+        print(json.dumps(plan, indent=2))
+    else:
+        show_plan(plan)
+
+if __name__ == "__main__":
+    main()
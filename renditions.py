@@ -0,0 +1,104 @@
+import os
+import autotune
+
+# Extra output renditions from a single decode.
+#
+# Scripts keep their main output as before; every entry of their RENDITIONS
+# list adds one more file of the same content, written by the same ffmpeg
+# process. The decode and the script's filters (zoom, overlay, scaling...) run
+# once, `split` fans the result out, and each branch only pays for its own
+# scale and encode (ffmpeg runs the encoders of one command in parallel).
+#
+# A rendition is a short string:
+#   "720p"                 - height 720, width from the aspect ratio
+#   "1280x720@30"          - exact size and frame rate
+#   "854x480:crf=28"       - own CRF (default: the script's encoder settings)
+#   "720p:bitrate=2M"      - bitrate-capped instead of CRF (for upload limits)
+# Its file is the main output name plus the spec: last.mp4 -> last_720p.mp4,
+# "480p:crf=28" -> last_480p_crf28.mp4, "1280x720@60" -> last_1280x720_60fps.mp4
+
+def parse(spec):
+    size, _, quality = spec.partition(":")
+    size, _, fps = size.partition("@")
+    if size.lower().endswith("p"):
+        width, height = -2, int(size[:-1])
+    else:
+        width, height = (int(v) for v in size.lower().split("x"))
+    rendition = {"spec": spec, "width": width, "height": height,
+                 "fps": float(fps) if fps else None, "crf": None, "bitrate": None}
+    for item in filter(None, quality.split(",")):
+        key, _, value = item.partition("=")
+        if key not in ("crf", "bitrate"):
+            raise Exception(f"❌ Unknown rendition setting '{key}' in {spec}")
+        rendition[key] = int(value) if key == "crf" else value
+    return rendition
+
+def name(spec):
+    """File-name suffix for a spec: every setting in it, so different specs never share a file."""
+    size, _, quality = spec.partition(":")
+    size, _, fps = size.partition("@")
+    parts = [size.lower()] + ([f"{fps}fps"] if fps else [])
+    parts += [item.replace("=", "") for item in quality.split(",") if item]
+    return "_".join(parts)
+
+def check(renditions):
+    names = [name(spec) for spec in renditions]
+    for spec, n in zip(renditions, names):
+        if names.count(n) > 1:
+            raise Exception(f"❌ Rendition {spec} is listed more than once")
+
+def output_path(output_file, rendition):
+    base, ext = os.path.splitext(output_file)
+    return f"{base}_{name(rendition['spec'])}{ext}"
+
+def fan_out(filters, renditions, default_fps=None, input_label="0:v", audio_maps=(), main=True):
+    """Filter args feeding the main output and one labelled branch per rendition.
+
+    filters is the script's own ["-vf", chain], ["-filter_complex", graph]
+    (whose last chain has no output label) or []. Returns (filter args, maps
+    for the main output); without renditions both are unchanged / empty, so
+    the command stays exactly what it was. main=False leaves the main output
+    out (only renditions are written).
+    """
+    if not renditions:
+        return list(filters), []
+    check(renditions)
+    if filters and filters[0] == "-filter_complex":
+        head = filters[1] + ","
+    elif filters:
+        head = f"[{input_label}]{filters[1]},"
+    else:
+        head = f"[{input_label}]"
+    labels = "".join(f"[r{i}]" for i in range(len(renditions)))
+    graph = [f"{head}split={len(renditions) + int(main)}{'[main]' if main else ''}{labels}"]
+    for i, rendition in enumerate(map(parse, renditions)):
+        chain = f"[r{i}]scale={rendition['width']}:{rendition['height']}"
+        fps = rendition["fps"] or default_fps
+        if fps:
+            chain += f",fps={fps:g}"
+        graph.append(f"{chain},setsar=1[r{i}out]")
+    return ["-filter_complex", ";".join(graph)], ["-map", "[main]", *audio_maps] if main else []
+
+def video_args(rendition, encoder):
+    """libx264 options for one rendition, starting from the script's encoder settings."""
+    if rendition["bitrate"]:
+        rate = rendition["bitrate"]
+        return ["-preset", encoder["preset"], "-b:v", rate, "-maxrate", rate, "-bufsize", rate]
+    return autotune.encoder_args({**encoder, "crf": rendition["crf"] or encoder["crf"]})
+
+def output_args(renditions, output_file, encoder, audio_maps=(), shared_args=()):
+    """One output per rendition (goes after fan_out's filters, before the main output).
+
+    shared_args are the main output's non-video options (audio codec, -t,
+    movflags...), repeated for every rendition.
+    """
+    args = []
+    for i, rendition in enumerate(map(parse, renditions)):
+        args += ["-map", f"[r{i}out]", *audio_maps,
+                 "-c:v", "libx264", *video_args(rendition, encoder), "-pix_fmt", "yuv420p",
+                 *shared_args, output_path(output_file, rendition)]
+    return args
+
+def outputs(renditions, output_file):
+    """File names the renditions of output_file are written to."""
+    return [output_path(output_file, parse(spec)) for spec in renditions]
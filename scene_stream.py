@@ -0,0 +1,193 @@
+import heapq
+import subprocess
+import numpy as np
+from ffmpeg_runner import run_ffmpeg
+
+# Scene detection and frame quality from one low-resolution decode.
+#
+# ffmpeg scales the video down to ANALYSIS_WIDTH grayscale at ANALYSIS_FPS and
+# writes raw frames to a pipe. They are read BATCH_FRAMES at a time into
+# preallocated buffers and scored with whole-batch numpy operations:
+#
+#   scene      - change from the previous frame: histogram distance and mean
+#                absolute pixel difference, averaged (0..1)
+#   sharpness  - variance of the Laplacian (same measure as is_blurry)
+#   luma       - mean brightness (same measure as is_black)
+#
+# Nothing is written to disk; extract_clear_images.py picks scenes and their
+# best frames from the returned arrays, or asks top_frames() for the best
+# stills of the whole video without any scene detection.
+
+ANALYSIS_WIDTH = 320
+ANALYSIS_FPS = 10
+BATCH_FRAMES = 64
+HIST_BINS = 32
+MAD_SCALE = 64.0  # mean absolute difference that counts as a full change
+CANDIDATE_FACTOR = 4  # top_frames keeps this many candidates per wanted frame
+
+class StreamAnalysis:
+    def __init__(self, fps, scene, sharpness, luma):
+        self.fps = fps
+        self.scene = scene
+        self.sharpness = sharpness
+        self.luma = luma
+
+    def __len__(self):
+        return len(self.scene)
+
+    @property
+    def pts(self):
+        return np.arange(len(self.scene)) / self.fps
+
+    def scene_scores(self):
+        """[(pts_time, score), ...] like extract_clear_images.scan_scene_scores."""
+        return list(zip(self.pts.tolist(), self.scene.tolist()))
+
+def probe(input_video):
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=width,height", "-of", "csv=p=0",
+        input_video
+    ], capture_output=True, text=True, check=True)
+    width, height = map(int, result.stdout.strip().split(",")[:2])
+    return width, height
+
+def stream_scores(input_video, on_batch, width=ANALYSIS_WIDTH, fps=ANALYSIS_FPS, batch=BATCH_FRAMES):
+    """Decode once and call on_batch(first, scene, sharpness, luma, hist) per batch.
+
+    first is the index of the batch's first frame (pts = index / fps). hist is
+    a view into a reused buffer, so copy any rows that need to be kept.
+    """
+    src_width, src_height = probe(input_video)
+    height = int(round(width * src_height / src_width / 2)) * 2
+    pixels = width * height
+    shift = 8 - int(np.log2(HIST_BINS))
+
+    # Slot 0 of frames / hist holds the last frame of the previous batch
+    frames = np.zeros((batch + 1, height, width), np.uint8)
+    hist = np.zeros((batch + 1, HIST_BINS), np.float32)
+    diff = np.empty((batch, height, width), np.float32)
+    lap = np.empty((batch, height - 2, width - 2), np.float32)
+    bins = np.empty((batch, pixels), np.int32)
+    offsets = (np.arange(batch, dtype=np.int32) * HIST_BINS)[:, None]
+
+    done = [0]
+
+    def score_batch(n):
+        cur, prev = frames[1:n + 1], frames[:n]
+
+        np.subtract(cur, prev, out=diff[:n], dtype=np.float32)
+        np.abs(diff[:n], out=diff[:n])
+        mad = diff[:n].mean(axis=(1, 2))
+
+        np.right_shift(cur.reshape(n, pixels), shift, out=bins[:n], dtype=np.int32)
+        np.add(bins[:n], offsets[:n], out=bins[:n])
+        hist[1:n + 1] = np.bincount(bins[:n].ravel(), minlength=n * HIST_BINS).reshape(n, HIST_BINS) / pixels
+        hist_distance = np.abs(hist[1:n + 1] - hist[:n]).sum(axis=1) / 2
+
+        scene = (hist_distance + np.minimum(mad / MAD_SCALE, 1.0)) / 2
+        if not done[0]:
+            scene[0] = 0.0  # nothing before the first frame
+
+        # 4-neighbour Laplacian on the interior pixels
+        np.multiply(cur[:, 1:-1, 1:-1], 4, out=lap[:n], dtype=np.float32)
+        np.subtract(lap[:n], cur[:, :-2, 1:-1], out=lap[:n])
+        np.subtract(lap[:n], cur[:, 2:, 1:-1], out=lap[:n])
+        np.subtract(lap[:n], cur[:, 1:-1, :-2], out=lap[:n])
+        np.subtract(lap[:n], cur[:, 1:-1, 2:], out=lap[:n])
+        area = lap.shape[1] * lap.shape[2]
+        mean = lap[:n].sum(axis=(1, 2), dtype=np.float64) / area
+        sharpness = np.einsum("ijk,ijk->i", lap[:n], lap[:n], dtype=np.float64) / area - mean ** 2
+
+        luma = cur.mean(axis=(1, 2), dtype=np.float64)
+
+        on_batch(done[0], scene, sharpness, luma, hist[1:n + 1])
+        done[0] += n
+        frames[0] = frames[n]
+        hist[0] = hist[n]
+
+    buffer = memoryview(frames[1:]).cast("B")
+
+    def read_frames(stream):
+        while True:
+            got = 0
+            while got < len(buffer):
+                n = stream.readinto(buffer[got:])
+                if not n:
+                    break
+                got += n
+            if got >= pixels:
+                score_batch(got // pixels)
+            if got < len(buffer):
+                return
+
+    print(f"🔍 Analyzing {input_video} at {width}x{height}, {fps} fps...")
+    run_ffmpeg([
+        'ffmpeg', '-i', input_video,
+        '-vf', f'fps={fps},scale={width}:{height},format=gray',
+        '-an', '-f', 'rawvideo', '-pix_fmt', 'gray', '-'
+    ], step="scene_stream", capture_stderr=True, stdout_reader=read_frames)
+
+
+def analyze(input_video, width=ANALYSIS_WIDTH, fps=ANALYSIS_FPS, batch=BATCH_FRAMES):
+    """Per-frame scene, sharpness and luma arrays for the whole video."""
+    # Per-batch score vectors (a few floats per frame), joined at the end
+    scores = {"scene": [], "sharpness": [], "luma": []}
+
+    def keep(first, scene, sharpness, luma, hist):
+        scores["scene"].append(scene.astype(np.float32))
+        scores["sharpness"].append(sharpness.astype(np.float32))
+        scores["luma"].append(luma.astype(np.float32))
+
+    stream_scores(input_video, keep, width, fps, batch)
+    joined = {k: np.concatenate(v) if v else np.zeros(0, np.float32) for k, v in scores.items()}
+    return StreamAnalysis(fps, joined["scene"], joined["sharpness"], joined["luma"])
+
+def top_frames(input_video, count, min_gap, min_difference, min_luma, min_sharpness,
+               width=ANALYSIS_WIDTH, fps=ANALYSIS_FPS, batch=BATCH_FRAMES):
+    """The `count` sharpest frames, at least min_gap seconds apart and visibly different.
+
+    Streaming: within each min_gap-long time bucket only the sharpest frame
+    survives, and only the best count * CANDIDATE_FACTOR buckets are kept in a
+    heap, so memory does not grow with the video. The final pick walks the
+    heap sharpest first, skipping frames too close in time or whose histogram
+    differs from an already picked one by less than min_difference (0..1).
+    Returns [(pts_time, sharpness), ...] in time order.
+    """
+    heap = []        # (sharpness, pts_time, hist) - smallest on top
+    bucket = [None]  # [bucket number, sharpness, pts_time, hist] of the current bucket's best
+    limit = count * CANDIDATE_FACTOR
+
+    def push(candidate):
+        entry = (candidate[1], candidate[2], candidate[3])
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def on_batch(first, scene, sharpness, luma, hist):
+        usable = np.flatnonzero((luma >= min_luma) & (sharpness >= min_sharpness))
+        for i in usable.tolist():
+            pts_time = (first + i) / fps
+            number = int(pts_time // min_gap) if min_gap else first + i
+            current = bucket[0]
+            if current is None or current[0] != number:
+                if current is not None:
+                    push(current)
+                bucket[0] = [number, float(sharpness[i]), pts_time, hist[i].copy()]
+            elif sharpness[i] > current[1]:
+                current[1:] = [float(sharpness[i]), pts_time, hist[i].copy()]
+
+    stream_scores(input_video, on_batch, width, fps, batch)
+    if bucket[0] is not None:
+        push(bucket[0])
+
+    picked = []
+    for sharpness, pts_time, hist in sorted(heap, key=lambda e: e[0], reverse=True):
+        if len(picked) >= count:
+            break
+        if any(abs(pts_time - t) < min_gap or np.abs(hist - h).sum() / 2 < min_difference
+               for t, _, h in picked):
+            continue
+        picked.append((pts_time, sharpness, hist))
+    return sorted((t, s) for t, s, _ in picked)
@@ -0,0 +1,74 @@
+import os
+import shutil
+from ffmpeg_runner import run_ffmpeg
+
+# Output modes for long renders:
+#   "mp4"  - one normal MP4, usable only when the encode finishes (old behaviour)
+#   "fmp4" - fragmented MP4, playable / uploadable while it is still being written
+#   "hls"  - HLS segments + a rolling (EVENT) playlist next to the output file;
+#            finalize() turns them into the normal MP4 with a stream-copy remux
+#
+# Preview while rendering:  ffplay last_hls/playlist.m3u8
+
+SEGMENT_SECONDS = 6
+
+def segment_dir(output_file):
+    return os.path.splitext(output_file)[0] + "_hls"
+
+def playlist_path(output_file):
+    return os.path.join(segment_dir(output_file), "playlist.m3u8")
+
+def keyframe_args(segment_seconds=SEGMENT_SECONDS):
+    """Keyframe on every segment boundary so segments come out evenly sized."""
+    return ["-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})"]
+
+def output_args(output_file, mode, append=False, ts_offset=0.0, segment_seconds=SEGMENT_SECONDS):
+    """ffmpeg output options + target for the chosen mode (goes at the end of the command).
+
+    append / ts_offset let several ffmpeg runs write one continuous playlist
+    (used by final.py, which encodes its inputs one after another).
+    """
+    if mode == "mp4":
+        return [output_file]
+    if mode == "fmp4":
+        return ["-movflags", "+frag_keyframe+empty_moov+default_base_moof", output_file]
+    if mode != "hls":
+        raise Exception(f"❌ Unknown output mode: {mode}")
+
+    folder = segment_dir(output_file)
+    if not append and os.path.exists(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder, exist_ok=True)
+
+    args = [
+        "-f", "hls",
+        "-hls_time", str(segment_seconds),
+        "-hls_list_size", "0",             # keep every segment in the playlist
+        "-hls_playlist_type", "event",     # playlist grows while encoding
+        "-hls_segment_type", "mpegts",
+        "-hls_segment_filename", os.path.join(folder, "seg_%05d.ts"),
+    ]
+    if append:
+        args += ["-hls_flags", "append_list"]
+    if ts_offset:
+        args += ["-output_ts_offset", f"{ts_offset:.6f}"]
+    return args + [playlist_path(output_file)]
+
+def finalize(output_file, mode, keep_segments=False):
+    """For "hls": remux the segments into output_file (no re-encode)."""
+    if mode != "hls":
+        return output_file
+
+    print(f"📦 Remuxing segments into {output_file}...")
+    run_ffmpeg([
+        "ffmpeg", "-y",
+        "-i", playlist_path(output_file),
+        "-map", "0", "-c", "copy",
+        "-bsf:a", "aac_adtstoasc",
+        "-movflags", "+faststart",
+        output_file
+    ], step="hls remux", check=True)
+
+    if not keep_segments:
+        shutil.rmtree(segment_dir(output_file), ignore_errors=True)
+    return output_file
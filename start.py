@@ -1,24 +1,46 @@
 import os
 import subprocess
+import autotune
+import renditions
+from ffmpeg_runner import run_ffmpeg
 
 # Input videos
 VIDEOS = ["trailer.mp4", "promotion.mp4"]
 FINAL_OUTPUT = "start.mp4"
 MERGE_LIST = "videos.txt"
+ENCODER = {"preset": "medium", "crf": 20, "threads": 0}
+ENCODE_BUDGET = None  # wall-clock seconds for all HD conversions; set it to let autotune pick preset/CRF/threads
+RENDITIONS = []  # extra outputs from the same decode, e.g. ["720p:crf=26"] -> start_720p_crf26.mp4 (see renditions.py)
 
 def check_files_exist():
     for video in VIDEOS:
         if not os.path.exists(video):
             raise FileNotFoundError(f"❌ File not found: {video}")
 
-def convert_to_hd(input_file, output_file):
+def get_video_duration(filename):
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        filename
+    ], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def convert_to_hd(input_file, output_file, encoder=ENCODER):
     """Convert video to HD 1080p with consistent audio/video format"""
     print(f"🎬 Converting {input_file} to HD...")
-    subprocess.run([
+    shared = ["-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart"]
+    filters, main_maps = renditions.fan_out(
+        ["-vf", "scale=-1:1080"],  # Scale height to 1080p, keep aspect ratio
+        RENDITIONS, default_fps=30, audio_maps=["-map", "0:a?"]
+    )
+    run_ffmpeg([
         "ffmpeg", "-y", "-i", input_file,
-        "-vf", "scale=-1:1080",  # Scale height to 1080p, keep aspect ratio
+        *filters,
+        *renditions.output_args(RENDITIONS, output_file, encoder, ["-map", "0:a?"], shared),
+        *main_maps,
         "-r", "30",              # 30 FPS
-        "-c:v", "libx264", "-preset", "medium", "-crf", "20",
+        "-c:v", "libx264", *autotune.encoder_args(encoder),
         "-c:a", "aac", "-b:a", "192k",
         "-movflags", "+faststart",
         "-pix_fmt", "yuv420p",
@@ -30,9 +52,15 @@ def merge_videos():
 
     try:
         # Step 1: Convert both videos to normalized HD format
+        durations = [get_video_duration(v) for v in VIDEOS] if ENCODE_BUDGET else []
         for i, video in enumerate(VIDEOS):
             out_file = f"hd_{i}.mp4"
-            convert_to_hd(video, out_file)
+            encoder = ENCODER
+            if ENCODE_BUDGET:
+                budget = ENCODE_BUDGET * durations[i] / sum(durations)
+                encoder = autotune.tune(["-i", video], ["-vf", "scale=-1:1080", "-r", "30"],
+                                        durations[i], budget, "hd-1080p")
+            convert_to_hd(video, out_file, encoder)
             converted_files.append(out_file)
 
         # Step 2: Create text file for FFmpeg concat
@@ -40,27 +68,40 @@ def merge_videos():
             for file in converted_files:
                 f.write(f"file '{file}'\n")
 
-        # Step 3: Concatenate videos
+        # Step 3: Concatenate videos (and every rendition the same way)
         print("🔗 Merging videos...")
-        subprocess.run([
+        run_ffmpeg([
             "ffmpeg", "-y", "-f", "concat", "-safe", "0",
             "-i", MERGE_LIST,
             "-c", "copy", FINAL_OUTPUT
         ], check=True)
+        for spec in RENDITIONS:
+            with open(MERGE_LIST, "w") as f:
+                for file in converted_files:
+                    f.write(f"file '{renditions.outputs([spec], file)[0]}'\n")
+            run_ffmpeg([
+                "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+                "-i", MERGE_LIST,
+                "-c", "copy", renditions.outputs([spec], FINAL_OUTPUT)[0]
+            ], check=True)
 
         print(f"\n✅ Merged video saved as: {FINAL_OUTPUT}")
 
     finally:
         # Cleanup temporary files
         for file in converted_files:
-            if os.path.exists(file):
-                os.remove(file)
+            for f in [file, *renditions.outputs(RENDITIONS, file)]:
+                if os.path.exists(f):
+                    os.remove(f)
         if os.path.exists(MERGE_LIST):
             os.remove(MERGE_LIST)
 
-if __name__ == "__main__":
+def main():
     try:
         check_files_exist()
         merge_videos()
     except Exception as e:
         print(f"❌ Error: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import os
 import random
 import subprocess
+import loudness
+from ffmpeg_runner import run_ffmpeg
 
 INPUT_VIDEO = "input.mp4"
 OUTPUT_VIDEO = "trailer.mp4"
@@ -8,6 +10,9 @@ DURATION_PER_CLIP = 3  # seconds
 TOTAL_DURATION = 35    # seconds
 NUM_CLIPS = TOTAL_DURATION // DURATION_PER_CLIP
 MUSIC_START_TIME = 8   # start music from 8 seconds
+BACKGROUND_MUSIC = "music.mp3"
+NORMALIZE_LOUDNESS = True  # measured gains (loudness.py) instead of fixed volume=0.02 / 1.0
+SOURCE_AUDIO_DB = -34      # original audio this far under the music (about the old volume=0.02)
 
 def extract_random_clips():
     # Get video duration
@@ -45,7 +50,7 @@ def create_clip_list(random_starts):
             f.write(f"file '{clip_filename}'\n")
             f.write(f"duration {DURATION_PER_CLIP}\n")
 
-            subprocess.run([
+            run_ffmpeg([
                 "ffmpeg", "-y",
                 "-ss", str(start_time),
                 "-t", str(DURATION_PER_CLIP),
@@ -56,6 +61,22 @@ def create_clip_list(random_starts):
             ], check=True)
             print(f"✅ Clip created: {clip_filename} ({start_time}-{start_time + DURATION_PER_CLIP}s)")
 
+def mix_filter(clips_video):
+    """Original audio under the music, both at measured loudness, in one pass.
+
+    The original audio is measured on the joined clips (only seconds long, so
+    not cached), not on the whole source video.
+    """
+    if not NORMALIZE_LOUDNESS:
+        return "[0:a]volume=0.02[a1];[1:a]volume=1.0[a2];[a1][a2]amix=inputs=2:duration=shortest[aout]"
+    gain = loudness.gain_db(loudness.analyze(clips_video), loudness.TARGET_LUFS + SOURCE_AUDIO_DB)
+    source = f"volume={gain:.2f}dB"
+    music = loudness.volume_filter(BACKGROUND_MUSIC)
+    return f"[0:a]{source}[a1];[1:a]{music}[a2];[a1][a2]amix=inputs=2:duration=shortest:normalize=0[aout]"
+
+def music_args():
+    return ["-af", loudness.volume_filter(BACKGROUND_MUSIC)] if NORMALIZE_LOUDNESS else []
+
 def has_audio_stream(file_path):
     result = subprocess.run(
         ["ffprobe", "-i", file_path, "-show_streams", "-select_streams", "a", "-loglevel", "error"],
@@ -68,17 +89,17 @@ def create_video():
     print("🎞️ Generating trailer...")
 
     # Create video from clips (will be in random order)
-    subprocess.run([
+    run_ffmpeg([
         "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", "clip_list.txt",
         "-vsync", "vfr", "-pix_fmt", "yuv420p", "temp_video.mp4"
     ], check=True)
     print("✅ Random clips video created: temp_video.mp4")
 
     # Create trimmed music (starting from 8 seconds)
-    subprocess.run([
+    run_ffmpeg([
         "ffmpeg", "-y",
         "-ss", str(MUSIC_START_TIME),
-        "-i", "music.mp3",
+        "-i", BACKGROUND_MUSIC,
         "-c", "copy", "trimmed_music.mp3"
     ], check=True)
     print("🎵 Trimmed music created (starting from 8 seconds)")
@@ -86,12 +107,12 @@ def create_video():
     # Add background music
     if has_audio_stream("temp_video.mp4"):
         print("🔈 Original audio found. Mixing with background music...")
-        subprocess.run([
+        run_ffmpeg([
             "ffmpeg", "-y",
             "-i", "temp_video.mp4",
             "-i", "trimmed_music.mp3",
             "-filter_complex",
-            "[0:a]volume=0.02[a1];[1:a]volume=1.0[a2];[a1][a2]amix=inputs=2:duration=shortest[aout]",
+            mix_filter("temp_video.mp4"),
             "-map", "0:v",
             "-map", "[aout]",
             "-c:v", "copy",
@@ -101,12 +122,13 @@ def create_video():
         ], check=True)
     else:
         print("🎵 No original audio found. Adding only background music...")
-        subprocess.run([
+        run_ffmpeg([
             "ffmpeg", "-y",
             "-i", "temp_video.mp4",
             "-i", "trimmed_music.mp3",
             "-map", "0:v:0",
             "-map", "1:a:0",
+            *music_args(),
             "-c:v", "copy",
             "-c:a", "aac",
             "-shortest",
@@ -121,6 +143,7 @@ def create_video():
             os.remove(f)
 
 def main():
+    random_starts = []
     try:
         random_starts = extract_random_clips()
         create_clip_list(random_starts)
@@ -128,8 +151,8 @@ def main():
     except Exception as e:
         print(f"⚠️ Error: {e}")
     finally:
-        # Clean up clip files
-        for start_time in range(0, 10000):
+        # Clean up only the clips this run created
+        for start_time in random_starts:
             clip_filename = f"clip_{start_time}.mp4"
             if os.path.exists(clip_filename):
                 os.remove(clip_filename)
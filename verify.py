@@ -0,0 +1,172 @@
+import sys
+import json
+import argparse
+import subprocess
+
+# Output verifier that reads packet timestamps only (no decoding), so it runs
+# at I/O speed even on multi-hour files.
+#
+# For every audio / video stream it finds the first and last timestamp, and
+# every gap or overlap between one packet's end and the next packet's start
+# (decode order, so B-frames do not count). From that it reports:
+#   - duration mismatch against an expected length
+#   - gaps / overlaps, and what happens at given join points (concat seams)
+#   - A/V offset at the start and at the end (audio cut short, setpts drift)
+#   - DTS going backwards and streams without packets - these are fatal()
+#     (players and muxers choke on them); the rest are warnings within tolerances
+#
+#   python verify.py final_output.mp4 --expect-duration 7860 --joins 35.0 1025.0
+
+GAP_TOLERANCE = 0.05       # seconds of missing / doubled media before it counts
+AV_TOLERANCE = 0.1         # allowed audio vs video difference at start and end
+DURATION_TOLERANCE = 0.5   # allowed difference from the expected duration
+JOIN_WINDOW = 1.0          # a discontinuity this close to a join belongs to it
+
+def probe_streams(path):
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-of", "json",
+        "-show_entries", "stream=index,codec_type:format=duration",
+        path
+    ], capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    streams = {s["index"]: s["codec_type"] for s in info.get("streams", [])
+               if s.get("codec_type") in ("audio", "video")}
+    return streams, float(info.get("format", {}).get("duration", 0) or 0)
+
+def number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None  # N/A
+
+def scan_packets(path, streams):
+    """Stream ffprobe's packet list once; per-stream start, end and discontinuities."""
+    state = {index: {"type": kind, "start": None, "end": None, "packets": 0,
+                     "discontinuities": [], "backwards": [], "last": None}
+             for index, kind in streams.items()}
+    proc = subprocess.Popen([
+        "ffprobe", "-v", "error", "-of", "csv=p=0",
+        "-show_entries", "packet=stream_index,pts_time,dts_time,duration_time",
+        path
+    ], stdout=subprocess.PIPE, text=True)
+    for line in proc.stdout:
+        fields = line.strip().split(",")
+        if len(fields) < 4 or not fields[0].isdigit():
+            continue
+        s = state.get(int(fields[0]))
+        if s is None:
+            continue
+        pts, dts, duration = number(fields[1]), number(fields[2]), number(fields[3])
+        time = dts if dts is not None else pts
+        if time is None:
+            continue
+        if duration is None:
+            duration = s["last"][1] if s["last"] else 0.0
+
+        if s["last"] is not None and time < s["last"][0]:
+            s["backwards"].append(round(time, 3))  # non-monotonic DTS
+        if s["last"] is not None:
+            expected = s["last"][0] + s["last"][1]
+            gap = time - expected
+            if abs(gap) > GAP_TOLERANCE:
+                s["discontinuities"].append({"at": round(expected, 3), "gap": round(gap, 3)})
+        s["last"] = (time, duration)
+        s["packets"] += 1
+
+        shown = pts if pts is not None else time
+        s["start"] = shown if s["start"] is None else min(s["start"], shown)
+        s["end"] = shown + duration if s["end"] is None else max(s["end"], shown + duration)
+    if proc.wait() != 0:
+        raise Exception(f"❌ ffprobe could not read packets of {path}")
+
+    for s in state.values():
+        del s["last"]
+        if s["start"] is not None:
+            s["duration"] = round(s["end"] - s["start"], 3)
+    return state
+
+def analyze(path, joins=()):
+    streams, container_duration = probe_streams(path)
+    state = scan_packets(path, streams)
+    result = {"file": path, "duration": container_duration, "streams": state}
+
+    video = next((s for s in state.values() if s["type"] == "video" and s["packets"]), None)
+    audio = next((s for s in state.values() if s["type"] == "audio" and s["packets"]), None)
+    if video and audio:
+        result["av_start_offset"] = round(audio["start"] - video["start"], 3)
+        result["av_end_offset"] = round(audio["end"] - video["end"], 3)
+
+    result["joins"] = []
+    for join in joins:
+        seams = {}
+        for index, s in state.items():
+            near = [d for d in s["discontinuities"] if abs(d["at"] - join) <= JOIN_WINDOW]
+            seams[index] = near[0]["gap"] if near else 0.0
+        result["joins"].append({"at": join, "gaps": seams})
+    return result
+
+def fatal(result):
+    """Problems that make the file broken, not just imprecise."""
+    found = []
+    for index, s in sorted(result["streams"].items()):
+        if not s["packets"]:
+            found.append(f"{s['type']} stream #{index} has no packets")
+        if s["backwards"]:
+            found.append(f"{s['type']} #{index}: DTS goes backwards {len(s['backwards'])}x "
+                         f"(first at {s['backwards'][0]:.3f}s)")
+    return found
+
+def problems(result, expected_duration=None):
+    """Everything found: fatal() plus gaps, A/V offsets and duration outside the tolerances."""
+    found = fatal(result)
+    if expected_duration is not None and abs(result["duration"] - expected_duration) > DURATION_TOLERANCE:
+        found.append(f"duration {result['duration']:.2f}s, expected {expected_duration:.2f}s")
+    for index, s in sorted(result["streams"].items()):
+        for d in s["discontinuities"]:
+            kind = "gap" if d["gap"] > 0 else "overlap"
+            found.append(f"{s['type']} #{index}: {kind} of {abs(d['gap']):.3f}s at {d['at']:.3f}s")
+    for key, label in (("av_start_offset", "start"), ("av_end_offset", "end")):
+        offset = result.get(key)
+        if offset is not None and abs(offset) > AV_TOLERANCE:
+            which = "audio later than video" if offset > 0 else "audio earlier than video"
+            found.append(f"A/V offset at {label}: {abs(offset):.3f}s ({which})")
+    return found
+
+def verify(path, expected_duration=None, joins=()):
+    """Scan, print a short report, return the list of problems (empty = OK)."""
+    result = analyze(path, joins)
+    found = problems(result, expected_duration)
+    print(f"🔎 {path}: {result['duration']:.2f}s")
+    for index, s in sorted(result["streams"].items()):
+        if s["packets"]:
+            print(f"   #{index} {s['type']}: {s['start']:.3f}s -> {s['end']:.3f}s, {s['packets']} packets")
+    for join in result["joins"]:
+        seams = ", ".join(f"#{i} {g:+.3f}s" for i, g in sorted(join["gaps"].items()))
+        print(f"   join at {join['at']:.3f}s: {seams}")
+    for problem in found:
+        print(f"   ⚠️ {problem}")
+    if not found:
+        print("   ✅ timestamps continuous, audio and video aligned")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Check output timestamps per stream without decoding.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--expect-duration", type=float, help="expected duration in seconds")
+    parser.add_argument("--joins", type=float, nargs="+", default=[], help="concat join times to report on")
+    parser.add_argument("--json", action="store_true", help="print the full scan as JSON")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.files:
+        if args.json:
+            result = analyze(path, args.joins)
+            result["problems"] = problems(result, args.expect_duration)
+            print(json.dumps(result, indent=2))
+            failed = failed or bool(result["problems"])
+        else:
+            failed = bool(verify(path, args.expect_duration, args.joins)) or failed
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
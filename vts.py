@@ -0,0 +1,256 @@
+import os
+import sys
+import argparse
+
+# One entry point for every workflow:
+#   python vts.py slideshow --duration 2200 --image-duration 10
+#   python vts.py cut --start 00:00:10 --end 02:10:36
+#   python vts.py pipeline -- --jobs 3
+#
+# Only argparse is imported at startup. Each subcommand loads its script (and
+# whatever heavy libraries it needs) when it actually runs, so --help, probe
+# and planning commands start in tens of milliseconds.
+
+# Option = (flag, script constant, type, help). type "flag" sets the constant to True.
+COMMANDS = {
+    "scenes": {
+        "module": "extract_clear_images", "func": "run_scene_detection",
+        "help": "scene detection only (writes scene_timestamps.txt)",
+        "options": [("--input", "INPUT_VIDEO", str, "source video"),
+                    ("--threshold", "SCENE_THRESHOLD", float, "scene score threshold"),
+                    ("--target-scenes", "TARGET_SCENES", int, "pick the threshold for about this many scenes"),
+                    ("--min-spacing", "MIN_SCENE_SPACING", float, "minimum seconds between scenes")],
+    },
+    "extract": {
+        "module": "extract_clear_images",
+        "help": "extract the best clear frame per scene",
+        "options": [("--input", "INPUT_VIDEO", str, "source video"),
+                    ("--out", "CLEAR_FRAMES_DIR", str, "folder for the chosen frames"),
+                    ("--target-scenes", "TARGET_SCENES", int, "pick the threshold for about this many scenes"),
+                    ("--min-spacing", "MIN_SCENE_SPACING", float, "minimum seconds between scenes"),
+                    ("--frame-store", "USE_FRAME_STORE", "flag", "keep candidates in a memory-mapped frame store"),
+                    ("--engine", "SCENE_ENGINE", str, "ffmpeg or numpy (one low-res decode for scenes and scores)"),
+                    ("--stream-threshold", "STREAM_SCENE_THRESHOLD", float, "scene score threshold of the numpy engine"),
+                    ("--top", "TOP_FRAMES", int, "no scene detection: keep the N best stills of the video"),
+                    ("--min-gap", "MIN_FRAME_GAP", float, "seconds between --top picks")],
+    },
+    "slideshow": {
+        "module": "last",
+        "help": "zoom slideshow with looping music (last.py)",
+        "options": [("--images", "IMAGE_FOLDER", str, "image folder"),
+                    ("--music", "BACKGROUND_MUSIC", str, "background music"),
+                    ("--output", "OUTPUT_VIDEO", str, "output video"),
+                    ("--image-duration", "IMAGE_DURATION", int, "seconds per image"),
+                    ("--duration", "TOTAL_DURATION", int, "total seconds"),
+                    ("--budget", "ENCODE_BUDGET", float, "wall-clock budget for autotune"),
+                    ("--mode", "OUTPUT_MODE", str, "mp4, fmp4 or hls"),
+                    ("--resumable", "RESUMABLE", "flag", "render in resumable chunks"),
+                    ("--zoom", "ZOOM_ENGINE", str, "kenburns (precomputed clips) or zoompan; default: kenburns for mp4, zoompan for fmp4 / hls"),
+                    ("--renditions", "RENDITIONS", "list", "extra outputs from the same decode, e.g. 480p:crf=28")],
+        "flags": [("--native-level", "NORMALIZE_LOUDNESS", False, "keep audio at its own level (no loudness matching)")],
+    },
+    "fast-slideshow": {
+        "module": "fastlast",
+        "help": "slideshow without zoom (fastlast.py)",
+        "options": [("--images", "IMAGE_FOLDER", str, "image folder"),
+                    ("--music", "BACKGROUND_MUSIC", str, "background music"),
+                    ("--output", "OUTPUT_VIDEO", str, "output video"),
+                    ("--image-duration", "IMAGE_DURATION", int, "seconds per image"),
+                    ("--duration", "TOTAL_DURATION", int, "total seconds"),
+                    ("--budget", "ENCODE_BUDGET", float, "wall-clock budget for autotune")],
+        "flags": [("--native-level", "NORMALIZE_LOUDNESS", False, "keep audio at its own level (no loudness matching)")],
+    },
+    "loading": {
+        "module": "loading",
+        "help": "long silent slideshow (loading.py)",
+        "options": [("--images", "IMAGES_DIR", str, "image folder"),
+                    ("--output", "OUTPUT_VIDEO", str, "output video"),
+                    ("--image-duration", "DURATION_PER_IMAGE", int, "seconds per image"),
+                    ("--duration", "TOTAL_DURATION", int, "total seconds"),
+                    ("--budget", "ENCODE_BUDGET", float, "wall-clock budget for autotune"),
+                    ("--mode", "OUTPUT_MODE", str, "mp4, fmp4 or hls"),
+                    ("--resumable", "RESUMABLE", "flag", "render in resumable chunks")],
+        "derive": lambda m: {"NUM_IMAGES": m.TOTAL_DURATION // m.DURATION_PER_IMAGE},
+    },
+    "trailer": {
+        "module": "trailer",
+        "help": "random-clip trailer with music (trailer.py)",
+        "options": [("--input", "INPUT_VIDEO", str, "source video"),
+                    ("--output", "OUTPUT_VIDEO", str, "output video"),
+                    ("--music", "BACKGROUND_MUSIC", str, "background music"),
+                    ("--clip-duration", "DURATION_PER_CLIP", int, "seconds per clip"),
+                    ("--duration", "TOTAL_DURATION", int, "total seconds"),
+                    ("--music-start", "MUSIC_START_TIME", int, "music start offset")],
+        "derive": lambda m: {"NUM_CLIPS": m.TOTAL_DURATION // m.DURATION_PER_CLIP},
+        "flags": [("--native-level", "NORMALIZE_LOUDNESS", False, "keep audio at its own level (no loudness matching)")],
+    },
+    "trailer-flip": {
+        "module": "trailerflip",
+        "help": "mirrored and slowed trailer (trailerflip.py)",
+        "options": [("--input", "INPUT_VIDEO", str, "source video"),
+                    ("--output", "OUTPUT_VIDEO", str, "output video"),
+                    ("--music", "BACKGROUND_MUSIC", str, "background music"),
+                    ("--clip-duration", "DURATION_PER_CLIP", int, "seconds per clip"),
+                    ("--duration", "TOTAL_DURATION", int, "total seconds"),
+                    ("--music-start", "MUSIC_START_TIME", int, "music start offset"),
+                    ("--slow", "SLOW_FACTOR", float, "slow-down factor")],
+        "derive": lambda m: {"NUM_CLIPS": m.TOTAL_DURATION // m.DURATION_PER_CLIP},
+        "flags": [("--native-level", "NORMALIZE_LOUDNESS", False, "keep audio at its own level (no loudness matching)")],
+    },
+    "overlay": {
+        "module": "overlay",
+        "help": "slideshow with green-screen overlay (overlay.py)",
+        "options": [("--images", "IMAGES_DIR", str, "image folder"),
+                    ("--overlay", "OVERLAY_VIDEO", str, "green-screen video"),
+                    ("--slides", "OUTPUT_VIDEO", str, "intermediate slideshow"),
+                    ("--output", "FINAL_VIDEO", str, "output video"),
+                    ("--image-duration", "DURATION_PER_IMAGE", int, "seconds per image"),
+                    ("--num-images", "NUM_IMAGES", int, "expected number of images"),
+                    ("--budget", "ENCODE_BUDGET", float, "wall-clock budget per encode"),
+                    ("--renditions", "RENDITIONS", "list", "extra outputs from the same decode, e.g. 480p:crf=28")],
+    },
+    "promo": {
+        "module": "permotion",
+        "help": "1080p promotion slideshow (permotion.py)",
+        "options": [("--images", "IMAGES_DIR", str, "image folder"),
+                    ("--output", "OUTPUT_VIDEO", str, "output video"),
+                    ("--image-duration", "DURATION_PER_IMAGE", int, "seconds per image"),
+                    ("--num-images", "NUM_IMAGES", int, "expected number of images"),
+                    ("--renditions", "RENDITIONS", "list", "extra outputs from the same decode, e.g. 480p:crf=28")],
+    },
+    "start": {
+        "module": "start",
+        "help": "convert to 1080p and merge (start.py)",
+        "options": [("--videos", "VIDEOS", "list", "videos to merge, in order"),
+                    ("--output", "FINAL_OUTPUT", str, "output video"),
+                    ("--budget", "ENCODE_BUDGET", float, "wall-clock budget for autotune"),
+                    ("--renditions", "RENDITIONS", "list", "extra outputs from the same decode, e.g. 480p:crf=28")],
+    },
+    "final": {
+        "module": "final",
+        "help": "normalize and merge (final.py)",
+        "options": [("--videos", "VIDEOS_TO_MERGE", "list", "videos to merge, in order"),
+                    ("--output", "FINAL_VIDEO", str, "output video"),
+                    ("--budget", "ENCODE_BUDGET", float, "wall-clock budget for autotune"),
+                    ("--mode", "OUTPUT_MODE", str, "mp4, fmp4 or hls")],
+    },
+    "merge-fast": {
+        "module": "finalfasy",
+        "help": "merge without re-encoding (finalfasy.py)",
+        "options": [("--videos", "VIDEOS_TO_MERGE", "list", "videos to merge, in order"),
+                    ("--output", "FINAL_VIDEO", str, "output video")],
+    },
+    "cut": {
+        "module": "cut",
+        "help": "frame-accurate trim (cut.py)",
+        "options": [("--input", "input_file", str, "video to cut"),
+                    ("--output", "output_file", str, "output video"),
+                    ("--start", "cut_start", str, "keep from HH:MM:SS"),
+                    ("--end", "cut_end", str, "keep until HH:MM:SS")],
+        "flags": [("--no-smart", "SMART_CUT", False, "keyframe-only cut, no re-encode")],
+    },
+    "generate": {
+        "module": "generate_slideshow",
+        "help": "moviepy slideshow (generate_slideshow.py)",
+        "options": [("--input", "INPUT_VIDEO", str, "source video"),
+                    ("--output", "OUTPUT_VIDEO", str, "output video"),
+                    ("--duration", "TOTAL_DURATION", int, "total seconds")],
+    },
+}
+
+# Tools with their own argparse: everything after the name is passed through
+PASSTHROUGH = {
+    "pipeline": ("pipeline", "run the whole pipeline, skipping unchanged stages"),
+    "plan": ("planner", "dry run: stages, ffmpeg calls, time and disk estimates"),
+    "batch": ("batch", "run a spool of jobs on a worker pool"),
+    "benchmark": ("benchmark", "benchmark the render paths"),
+    "autotune": ("autotune", "show cached encoder calibration"),
+    "verify": ("verify", "check output timestamps, joins and A/V offset without decoding"),
+}
+
+def probe(path):
+    """Quick ffprobe summary (no heavy imports)."""
+    import json
+    import subprocess
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-of", "json",
+        "-show_entries", "format=duration,size,bit_rate:stream=index,codec_type,codec_name,width,height,r_frame_rate,sample_rate,channels",
+        path
+    ], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"❌ {result.stderr.strip()}")
+        return 1
+    info = json.loads(result.stdout)
+    fmt = info.get("format", {})
+    print(f"📄 {path}: {float(fmt.get('duration', 0)):.2f}s, {int(fmt.get('size', 0)) / 1e6:.1f} MB")
+    for s in info.get("streams", []):
+        if s.get("codec_type") == "video":
+            print(f"   #{s['index']} video {s.get('codec_name')} {s.get('width')}x{s.get('height')} @ {s.get('r_frame_rate')}")
+        elif s.get("codec_type") == "audio":
+            print(f"   #{s['index']} audio {s.get('codec_name')} {s.get('sample_rate')} Hz, {s.get('channels')} ch")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="vts", description="Video to slideshow tools.")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    sub.required = True
+
+    for name, spec in COMMANDS.items():
+        p = sub.add_parser(name, help=spec["help"], description=spec["help"] + ". Unset options keep the script's value.")
+        for flag, const, kind, text in spec["options"]:
+            if kind == "flag":
+                p.add_argument(flag, dest=const, action="store_const", const=True, help=text)
+            elif kind == "list":
+                p.add_argument(flag, dest=const, nargs="+", help=text)
+            else:
+                p.add_argument(flag, dest=const, type=kind, help=text)
+        for flag, const, value, text in spec.get("flags", []):
+            p.add_argument(flag, dest=const, action="store_const", const=value, help=text)
+
+    p = sub.add_parser("probe", help="show duration and streams of a media file")
+    p.add_argument("file")
+
+    for name, (_, text) in PASSTHROUGH.items():
+        p = sub.add_parser(name, help=text, add_help=False)
+        p.add_argument("args", nargs=argparse.REMAINDER)
+    return parser
+
+def run_command(name, args):
+    import importlib
+    spec = COMMANDS[name]
+    module = importlib.import_module(spec["module"])
+
+    consts = [o[1] for o in spec["options"]] + [f[1] for f in spec.get("flags", [])]
+    for const in consts:
+        value = getattr(args, const, None)
+        if value is not None:
+            setattr(module, const, value)
+    if spec.get("derive"):
+        for const, value in spec["derive"](module).items():
+            setattr(module, const, value)
+
+    getattr(module, spec.get("func", "main"))()
+    return 0
+
+def main(argv=None):
+    # Scripts import each other by name, so make them importable from anywhere
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] in PASSTHROUGH:
+        import importlib
+        module_name, _ = PASSTHROUGH[argv[0]]
+        rest = argv[1:]
+        if rest[:1] == ["--"]:
+            rest = rest[1:]
+        sys.argv = [f"{module_name}.py"] + rest
+        importlib.import_module(module_name).main()
+        return 0
+
+    args = build_parser().parse_args(argv)
+    if args.command == "probe":
+        return probe(args.file)
+    return run_command(args.command, args)
+
+if __name__ == "__main__":
+    sys.exit(main())